@@ -0,0 +1,305 @@
+"""
+Batch rendering mode for renderer.py.
+
+Renders every device in an inventory against every template of its platform
+(aaa, snmp, ntp, mgmt, logging, acl) and writes one config file per device.
+Each worker process builds its Jinja Environment once per platform and
+compiles each template once, then renders its share of the devices.
+"""
+import json
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import yaml
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined, meta
+
+from config_context import ConfigContextEngine
+from process_pool import map_chunks
+from render_variables import Loader, file_hash, load_context, load_variables
+
+TEMPLATES_ROOT = "video-config-templates"
+CONTEXTS_DIR = "video-config-variables/config_contexts"
+# Directory of Nautobot-style weighted contexts (see config_context.py). When set, each device
+# gets its merged global/region/site/role/device context for every template instead of TEMPLATE_SETS files
+CONTEXT_LAYERS_DIR = None
+INVENTORY_FILE = "inventory.yml"
+OUTPUT_DIR = "rendered"
+MANIFEST_FILE = ".render-manifest.json" # Kept in the output directory
+MAX_WORKERS = os.cpu_count()
+# Compiled templates are kept here and shared by every run and worker process
+BYTECODE_CACHE_DIR = os.environ.get(
+    "JINJA_BYTECODE_CACHE", os.path.expanduser("~/.cache/network_automation/jinja")
+)
+
+# Template -> config context file, per platform (same pairs as the options in renderer.py)
+TEMPLATE_SETS = {
+    "cisco_xr": {
+        "aaa.j2": "video_iosxr_aaa.yml",
+        "snmp.j2": "video_iosxr_snmp.yml",
+        "ntp.j2": "video_iosxr_ntp.yml",
+        "mgmt.j2": "video_iosxr_mgmt.yml",
+        "logging.j2": "video_iosxr_logging.yml",
+        "acl.j2": "video_iosxr_acl.yml",
+    },
+    "cisco_nxos": {
+        "snmp.j2": "video_nxos_snmp.yml",
+        "ntp.j2": "video_nxos_ntp.yml",
+        "logging.j2": "video_nxos_logging.yml",
+        "mgmt.j2": "video_nxos_mgmt.yml",
+    },
+}
+
+
+@dataclass
+class RenderResult:
+    device: str
+    output_file: Optional[str] = None
+    templates: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    skipped: bool = False # Inputs unchanged since the last incremental run
+
+
+def build_environment(templatedir: str, bytecode_cache_dir: Optional[str] = BYTECODE_CACHE_DIR) -> Environment:
+    """
+    Same Environment settings as renderer.py, plus an on-disk bytecode cache.
+    Cache entries are keyed by template name and path and checked against a
+    checksum of the template source, so editing a template recompiles it.
+    """
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    return Environment(
+        loader=FileSystemLoader(templatedir), trim_blocks=True, lstrip_blocks=True, undefined=StrictUndefined,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+# Per-process caches: one Environment per platform, one compiled template per name
+_environments = {}
+
+
+def get_environment(platform: str) -> Environment:
+    if platform not in _environments:
+        _environments[platform] = build_environment(os.path.join(TEMPLATES_ROOT, platform))
+    return _environments[platform]
+
+
+def get_template(platform: str, template_name: str):
+    # Environment.get_template() keeps compiled templates, so each one is compiled once per process
+    return get_environment(platform).get_template(template_name)
+
+
+def template_dependencies(platform: str, template_name: str) -> set:
+    """
+    Returns the file paths a template depends on, including everything it
+    extends, includes or imports, recursively. A dynamic include whose name is
+    only known at render time makes the template depend on the whole directory.
+    """
+    env = get_environment(platform)
+    seen = set()
+    files = set()
+    pending = [template_name]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        source, filename, _ = env.loader.get_source(env, name)
+        files.add(filename)
+        for referenced in meta.find_referenced_templates(env.parse(source)):
+            if referenced is None:
+                files.update(
+                    os.path.join(env.loader.searchpath[0], listed) for listed in env.loader.list_templates()
+                )
+            else:
+                pending.append(referenced)
+    return files
+
+
+_dependencies = {}
+
+
+def device_inputs(device_name: str, device: dict, layers_dir: Optional[str] = CONTEXT_LAYERS_DIR) -> dict:
+    """
+    Content hashes of everything a device's output is built from:
+    template files (with their includes), variables files and the device data itself.
+    """
+    platform = device["platform"]
+    inputs = {}
+    for template_name, variables_file in TEMPLATE_SETS[platform].items():
+        if (platform, template_name) not in _dependencies:
+            _dependencies[(platform, template_name)] = template_dependencies(platform, template_name)
+        for path in _dependencies[(platform, template_name)]:
+            inputs[path] = file_hash(path)
+        if not layers_dir and not device.get("config_contexts"):
+            path = os.path.join(CONTEXTS_DIR, variables_file)
+            inputs[path] = file_hash(path)
+    if layers_dir:
+        for context in get_context_engine(layers_dir).matching(device):
+            inputs[context.path] = file_hash(context.path)
+    else:
+        for name in device.get("config_contexts") or ():
+            path = os.path.join(CONTEXTS_DIR, name)
+            inputs[path] = file_hash(path)
+    device_data = json.dumps({"hostname": device_name, "device": device}, sort_keys=True, default=str)
+    inputs["<device>"] = hashlib.sha256(device_data.encode()).hexdigest()
+    return inputs
+
+
+def load_manifest(output_dir: str = OUTPUT_DIR) -> dict:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), "r") as fin:
+            return json.load(fin)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: dict, output_dir: str = OUTPUT_DIR):
+    manifest_file = os.path.join(output_dir, MANIFEST_FILE)
+    with open(f"{manifest_file}.tmp", "w") as fout:
+        json.dump(manifest, fout, indent=1, sort_keys=True)
+    os.replace(f"{manifest_file}.tmp", manifest_file)
+
+
+# Per-process context engines, one per layers directory
+_engines = {}
+
+
+def get_context_engine(layers_dir: str) -> ConfigContextEngine:
+    if layers_dir not in _engines:
+        _engines[layers_dir] = ConfigContextEngine(layers_dir)
+    return _engines[layers_dir]
+
+
+def load_inventory(inventory_file: str = INVENTORY_FILE) -> dict:
+    """
+    Reads {device_name: {"platform": "cisco_xr", ...}} from a YAML file with a top-level 'devices' key.
+    Everything under the device is passed to the templates as 'device'.
+    An optional 'config_contexts' list of files under CONTEXTS_DIR replaces the per-template
+    context files: they are merged once per distinct list and given to every template.
+    With a context layers directory, 'region', 'site', 'role' and 'local_config_context_data'
+    select and extend the weighted contexts instead.
+    """
+    with open(inventory_file, "r") as fin:
+        return yaml.load(fin.read(), Loader=Loader)["devices"]
+
+
+def render_to(fout, device_name: str, device: dict, layers_dir: Optional[str] = CONTEXT_LAYERS_DIR) -> int:
+    """
+    Streams every template of the device's platform into a file-like object, chunk by chunk,
+    so huge ACLs are never held in memory as one string. Returns the number of templates rendered.
+    """
+    platform = device["platform"]
+    group_context = None
+    if layers_dir:
+        group_context = get_context_engine(layers_dir).context_for(device)
+    elif device.get("config_contexts"):
+        group_context = load_context(os.path.join(CONTEXTS_DIR, name) for name in device["config_contexts"])
+    templates = 0
+    for template_name, variables_file in TEMPLATE_SETS[platform].items():
+        if group_context is None:
+            config_context = load_variables(os.path.join(CONTEXTS_DIR, variables_file))
+        else:
+            config_context = group_context
+        variables = {
+            "config_context": config_context,
+            "hostname": device_name,
+            "device": device,
+        }
+        if templates:
+            fout.write("\n")
+        get_template(platform, template_name).stream(**variables).dump(fout)
+        templates += 1
+    return templates
+
+
+def render_device(device_name: str, device: dict, output_dir: str = OUTPUT_DIR,
+                  layers_dir: Optional[str] = CONTEXT_LAYERS_DIR) -> RenderResult:
+    """Renders every template of the device's platform into <output_dir>/<device>.txt. Never raises."""
+    result = RenderResult(device=device_name)
+    start = time.perf_counter()
+    output_file = os.path.join(output_dir, f"{device_name}.txt")
+    try:
+        # Rendered into a temp file first, so a failed render never leaves a half-written config behind
+        with open(f"{output_file}.tmp", "w") as fout:
+            result.templates = render_to(fout, device_name, device, layers_dir)
+        os.replace(f"{output_file}.tmp", output_file)
+        result.output_file = output_file
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        if os.path.exists(f"{output_file}.tmp"):
+            os.remove(f"{output_file}.tmp")
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _render_chunk(chunk: list, output_dir: str, layers_dir: Optional[str]) -> list:
+    return [render_device(device_name, device, output_dir, layers_dir) for device_name, device in chunk]
+
+
+def render_batch(inventory: dict, output_dir: str = OUTPUT_DIR, max_workers: int = MAX_WORKERS,
+                 layers_dir: Optional[str] = CONTEXT_LAYERS_DIR) -> list:
+    """
+    Renders every device in the inventory on a process pool.
+    Devices are sent to workers in chunks so templates and variables are reused within a worker.
+    Returns one RenderResult per device, in inventory order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    for chunk_results in map_chunks(_render_chunk, list(inventory.items()), output_dir, layers_dir,
+                                    max_workers=max_workers):
+        results.extend(chunk_results)
+    return results
+
+
+def render_incremental(inventory: dict, output_dir: str = OUTPUT_DIR, max_workers: int = MAX_WORKERS,
+                       layers_dir: Optional[str] = CONTEXT_LAYERS_DIR) -> list:
+    """
+    Like render_batch(), but only re-renders devices whose inputs changed since the last run.
+    Inputs are tracked per device in a content-hash manifest stored in the output directory.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    results = {}
+    inputs = {}
+    stale = {}
+    for device_name, device in inventory.items():
+        try:
+            inputs[device_name] = device_inputs(device_name, device, layers_dir)
+        except Exception:
+            # Missing template or variables file, let render_device report the error
+            stale[device_name] = device
+            continue
+        entry = manifest.get(device_name)
+        output_file = os.path.join(output_dir, f"{device_name}.txt")
+        if entry and entry["inputs"] == inputs[device_name] and os.path.exists(output_file):
+            results[device_name] = RenderResult(device=device_name, output_file=output_file, skipped=True)
+        else:
+            stale[device_name] = device
+
+    for result in render_batch(stale, output_dir, max_workers, layers_dir) if stale else []:
+        results[result.device] = result
+        if result.error is None and result.device in inputs:
+            manifest[result.device] = {"inputs": inputs[result.device]}
+        else:
+            manifest.pop(result.device, None)
+    # Devices removed from the inventory drop out of the manifest
+    manifest = {device_name: entry for device_name, entry in manifest.items() if device_name in inventory}
+    save_manifest(manifest, output_dir)
+    return [results[device_name] for device_name in inventory]
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    results = render_incremental(load_inventory())
+    for result in results:
+        if result.error:
+            print(f"{result.device}: {result.error}")
+    rendered = sum(1 for result in results if result.error is None and not result.skipped)
+    skipped = sum(1 for result in results if result.skipped)
+    print(f"Rendered {rendered}/{len(results)} devices ({skipped} unchanged) in {time.perf_counter() - start:.2f}s.")
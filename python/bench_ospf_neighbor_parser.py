@@ -0,0 +1,45 @@
+# bench_ospf_neighbor_parser.py
+"""Benchmarks parse_ospf_neighbors against synthetic routers with thousands of adjacencies."""
+import random
+import re
+import time
+from ospf_neighbor_parser import parse_ospf_neighbors
+
+SIZES = (100, 1000, 5000, 20000)
+STATES = ("FULL/DR", "FULL/BDR", "FULL/DROTHER", "FULL/  -", "2WAY/DROTHER", "INIT/  -", "EXSTART/  -", "DOWN/  -")
+RUNS = 5
+
+def synthetic_output(adjacencies: int, seed: int = 0) -> str:
+    """Builds a 'show ip ospf neighbor' output with the given number of adjacencies."""
+    rng = random.Random(seed)
+    lines = ["", "Neighbor ID     Pri   State           Dead Time   Address         Interface"]
+    for i in range(adjacencies):
+        neighbor_id = f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+        address = f"172.{16 + (i >> 16 & 15)}.{i >> 8 & 255}.{i & 255}"
+        state = rng.choice(STATES)
+        lines.append(f"{neighbor_id:<15} {rng.randint(0, 255):>4}   {state:<15} 00:00:{rng.randint(30, 39)}    "
+                     f"{address:<15} GigabitEthernet0/0/{i % 48}.{i}")
+    return "\n".join(lines) + "\n"
+
+def best_of(func, output: str) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func(output)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def legacy_parse(output: str) -> list:
+    """The regex gather_neighbors used before, for comparison (FULL neighbor IDs only)."""
+    return re.findall(r"^\s*(\d{1,3}(?:\.\d{1,3}){3})\s+\d+\s+FULL", output, re.MULTILINE)
+
+if __name__ == "__main__":
+    print(f"{'adjacencies':>12} {'legacy (ms)':>12} {'structured (ms)':>16} {'rows/s':>12}")
+    for size in SIZES:
+        output = synthetic_output(size)
+        assert len(parse_ospf_neighbors(output)) == size
+        # Device output from pyATS/unicon keeps CRLF line endings
+        assert parse_ospf_neighbors(output.replace("\n", "\r\n")) == parse_ospf_neighbors(output)
+        legacy = best_of(legacy_parse, output)
+        structured = best_of(parse_ospf_neighbors, output)
+        print(f"{size:>12} {legacy * 1000:>12.2f} {structured * 1000:>16.2f} {size / structured:>12.0f}")
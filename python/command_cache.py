@@ -0,0 +1,133 @@
+"""
+On-disk cache of device command output with per-command TTLs.
+
+Entries are keyed by (device, command, platform) and stored in a local SQLite
+file, so reruns of the collectors within a few minutes answer from disk
+instead of logging into the routers again. The cache is trimmed in least
+recently used order once it grows past its size limit.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+CACHE_FILE = os.path.expanduser("~/.cache/network_automation/command_cache.sqlite")
+DEFAULT_TTL = 120 # Seconds an entry stays valid when the command has no TTL below
+MAX_CACHE_BYTES = 256 * 1024 * 1024 # Total output size kept before LRU eviction
+
+# Per-command TTLs in seconds, slow-changing output can be kept longer
+COMMAND_TTLS = {
+    "show version": 3600,
+    "show inventory": 3600,
+    "show run": 300,
+    "show running-config": 300,
+    "show ip route": 60,
+    "show ip ospf neighbor": 30,
+}
+
+
+class CommandCache:
+    """Thread-safe TTL + LRU cache of command output backed by SQLite."""
+
+    def __init__(self, path: str = CACHE_FILE, ttls: Optional[dict] = None, default_ttl: float = DEFAULT_TTL,
+                 max_bytes: int = MAX_CACHE_BYTES):
+        self.path = path
+        self.ttls = COMMAND_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS outputs ("
+            " device TEXT, command TEXT, platform TEXT, output TEXT, size INTEGER,"
+            " expires REAL, accessed REAL, PRIMARY KEY (device, command, platform))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS outputs_accessed ON outputs (accessed)")
+        self._db.commit()
+
+    @staticmethod
+    def _key(device: str, command: str, platform: Optional[str]) -> tuple:
+        # Whitespace and a trailing newline should not create separate entries
+        return (device, " ".join(command.split()), platform or "")
+
+    def ttl(self, command: str) -> float:
+        return self.ttls.get(" ".join(command.split()), self.default_ttl)
+
+    def get(self, device: str, command: str, platform: Optional[str] = None) -> Optional[str]:
+        """Returns the cached output, or None if missing or expired."""
+        key = self._key(device, command, platform)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output, expires FROM outputs WHERE device=? AND command=? AND platform=?", key
+            ).fetchone()
+            if row is None or row[1] < now:
+                self.stats["misses"] += 1
+                return None
+            self._db.execute(
+                "UPDATE outputs SET accessed=? WHERE device=? AND command=? AND platform=?", (now, *key)
+            )
+            self._db.commit()
+            self.stats["hits"] += 1
+            return row[0]
+
+    def set(self, device: str, command: str, output: str, platform: Optional[str] = None):
+        """Stores output with the TTL of its command and evicts LRU entries if over the size limit."""
+        key = self._key(device, command, platform)
+        ttl = self.ttl(command)
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, output, len(output), now + ttl, now)
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drops expired entries, then the least recently used ones until under max_bytes."""
+        self._db.execute("DELETE FROM outputs WHERE expires < ?", (time.time(),))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM outputs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT rowid, size FROM outputs ORDER BY accessed").fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= size
+        self._db.executemany("DELETE FROM outputs WHERE rowid=?", doomed)
+
+    def invalidate(self, device: str, command: Optional[str] = None):
+        """Drops every entry for a device, or just one command."""
+        with self._lock:
+            if command is None:
+                self._db.execute("DELETE FROM outputs WHERE device=?", (device,))
+            else:
+                self._db.execute(
+                    "DELETE FROM outputs WHERE device=? AND command=?", (device, " ".join(command.split()))
+                )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM outputs")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
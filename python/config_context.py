@@ -0,0 +1,106 @@
+"""
+Config context merge engine modelled on Nautobot config contexts.
+
+Each YAML file in a directory is one context. An optional '_metadata' block
+gives it a name, a weight and the scope it applies to, the same way Nautobot
+reads config contexts from a Git repository:
+
+    _metadata:
+      name: lax-site
+      weight: 300
+      sites: [lax]
+    ntp:
+      servers: [10.0.0.1]
+
+Scope keys are 'regions', 'sites', 'roles' and 'platforms', matched against
+the device's 'region', 'site', 'role' and 'platform'. A context with no scope
+is global. Matching contexts are deep-merged in ascending weight (then name),
+so heavier contexts win, and the device's 'local_config_context_data' goes on
+top. Every distinct set of matching contexts is merged only once.
+"""
+import glob
+import os
+import threading
+
+from render_variables import deep_merge, load_variables
+
+DEFAULT_WEIGHT = 1000
+# Context scope key -> device key
+SCOPES = {
+    "regions": "region",
+    "sites": "site",
+    "roles": "role",
+    "platforms": "platform",
+}
+
+
+class ConfigContext:
+    __slots__ = ("name", "weight", "path", "scope", "data")
+
+    def __init__(self, name: str, weight: int, path: str, scope: dict, data: dict):
+        self.name = name
+        self.weight = weight
+        self.path = path
+        self.scope = scope # {"sites": frozenset(...), ...}, empty for a global context
+        self.data = data
+
+    def applies_to(self, device: dict) -> bool:
+        """True if the device matches every scope the context sets, like Nautobot's AND across scopes."""
+        return all(device.get(SCOPES[key]) in values for key, values in self.scope.items())
+
+
+def load_context_file(path: str) -> ConfigContext:
+    data = dict(load_variables(path) or {})
+    metadata = data.pop("_metadata", None) or {}
+    scope = {}
+    for key in SCOPES:
+        values = metadata.get(key)
+        if not values:
+            continue
+        if isinstance(values, dict):
+            raise ValueError(f"{path}: _metadata.{key} must be a name or a list of names")
+        # 'sites: lax' means one site, not the letters of 'lax'
+        scope[key] = frozenset(values if isinstance(values, (list, tuple, set)) else [values])
+    name = metadata.get("name") or os.path.splitext(os.path.basename(path))[0]
+    return ConfigContext(name, int(metadata.get("weight", DEFAULT_WEIGHT)), path, scope, data)
+
+
+class ConfigContextEngine:
+    """Loads every context in a directory and merges them per device."""
+
+    def __init__(self, contexts_dir: str):
+        paths = sorted(glob.glob(os.path.join(contexts_dir, "*.yml")) + glob.glob(os.path.join(contexts_dir, "*.yaml")))
+        self.contexts = sorted((load_context_file(path) for path in paths), key=lambda c: (c.weight, c.name))
+        self._merged = {} # tuple of context file paths -> merged data
+        self._lock = threading.Lock()
+        self.stats = {"merges": 0, "hits": 0}
+
+    def matching(self, device: dict) -> tuple:
+        """The contexts that apply to the device, in merge order."""
+        return tuple(context for context in self.contexts if context.applies_to(device))
+
+    def _merge(self, contexts: tuple) -> dict:
+        # Paths, not names: two files can share a _metadata name (or be x.yml and x.yaml)
+        key = tuple(context.path for context in contexts)
+        with self._lock:
+            if key in self._merged:
+                self.stats["hits"] += 1
+                return self._merged[key]
+        merged = {}
+        for context in contexts:
+            merged = deep_merge(merged, context.data)
+        with self._lock:
+            self._merged[key] = merged
+            self.stats["merges"] += 1
+        return merged
+
+    def context_for(self, device: dict) -> dict:
+        """
+        The rendered config context of a device. Devices with the same matching contexts
+        share one merged result, do not modify it.
+        """
+        merged = self._merge(self.matching(device))
+        local_data = device.get("local_config_context_data")
+        if local_data:
+            merged = deep_merge(merged, local_data)
+        return merged
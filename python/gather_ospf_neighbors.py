@@ -1,6 +1,10 @@
 # gather_ospf_neighbors.py
+from concurrent.futures import ThreadPoolExecutor
 from pyats.topology import Testbed
-import re
+from ospf_neighbor_parser import full_neighbor_ids, parse_ospf_neighbors
+import time
+
+MAX_WORKERS = 10
 
 def gather_neighbors(testbed: Testbed) -> dict:
     """Gathers OSPF neighbors for all devices in a pyATS Testbed object."""
@@ -10,11 +14,115 @@ def gather_neighbors(testbed: Testbed) -> dict:
         try:
             device.connect(log_stdout=False)
             output = device.execute("show ip ospf neighbor")
-            neighbor_ips = re.findall(r"^\s*(\d{1,3}(?:\.\d{1,3}){3})\s+\d+\s+FULL", output, re.MULTILINE)
+            neighbor_ips = full_neighbor_ids(parse_ospf_neighbors(output))
             device_neighbors[device_name] = neighbor_ips
         except Exception as e:
             print(f"Error gathering neighbors from {device_name}: {e}")
         finally:
             if device.connected:
                 device.disconnect()
-    return device_neighbors
\ No newline at end of file
+    return device_neighbors
+
+def _gather_device(device_name: str, device) -> dict:
+    """Gathers OSPF neighbors from one device, with timing and error info. Never raises."""
+    result = {"neighbors": None, "adjacencies": [], "elapsed": 0.0, "error": None}
+    start = time.perf_counter()
+    try:
+        device.connect(log_stdout=False)
+        output = device.execute("show ip ospf neighbor")
+        result["adjacencies"] = parse_ospf_neighbors(output)
+        result["neighbors"] = full_neighbor_ids(result["adjacencies"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if device.connected:
+            device.disconnect()
+        result["elapsed"] = time.perf_counter() - start
+    return result
+
+def gather_neighbors_parallel(testbed: Testbed, max_workers: int = MAX_WORKERS) -> tuple:
+    """
+    Gathers OSPF neighbors for all devices in a pyATS Testbed object in parallel.
+    Returns the same {device: [neighbor_ips]} dict as gather_neighbors, plus a
+    {device: {"elapsed": seconds, "error": str or None, "adjacencies": [OspfNeighbor]}}
+    dict covering every device, with adjacencies in every state.
+    """
+    device_neighbors = {}
+    device_stats = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            device_name: executor.submit(_gather_device, device_name, device)
+            for device_name, device in testbed.devices.items()
+        }
+        for device_name, future in futures.items():
+            result = future.result()
+            if result["error"] is None:
+                device_neighbors[device_name] = result["neighbors"]
+            else:
+                print(f"Error gathering neighbors from {device_name}: {result['error']}")
+            device_stats[device_name] = {
+                "elapsed": result["elapsed"],
+                "error": result["error"],
+                "adjacencies": result["adjacencies"],
+            }
+    return device_neighbors, device_stats
+
+def _poll_device(device_name: str, device) -> dict:
+    """Like _gather_device, but keeps the connection open and only reconnects if it dropped."""
+    result = {"neighbors": None, "adjacencies": [], "elapsed": 0.0, "error": None, "reconnected": False}
+    start = time.perf_counter()
+    try:
+        if not device.connected:
+            device.connect(log_stdout=False)
+            result["reconnected"] = True
+        output = device.execute("show ip ospf neighbor")
+        result["adjacencies"] = parse_ospf_neighbors(output)
+        result["neighbors"] = full_neighbor_ids(result["adjacencies"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        # Drop the broken session so the next cycle starts clean
+        try:
+            device.disconnect()
+        except Exception:
+            pass
+    finally:
+        result["elapsed"] = time.perf_counter() - start
+    return result
+
+def monitor_neighbors(testbed: Testbed, interval: float = 30, max_workers: int = MAX_WORKERS, cycles: int = None):
+    """
+    Polls OSPF neighbors every interval seconds over long-lived pyATS connections.
+    Only devices whose session failed are reconnected. Yields one report per cycle:
+    {"cycle", "elapsed", "neighbors", "stats"}, with neighbors and stats shaped like
+    gather_neighbors_parallel. Every device is disconnected when the generator is closed.
+    """
+    cycle = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while cycles is None or cycle < cycles:
+                cycle += 1
+                start = time.perf_counter()
+                futures = {
+                    device_name: executor.submit(_poll_device, device_name, device)
+                    for device_name, device in testbed.devices.items()
+                }
+                device_neighbors = {}
+                device_stats = {}
+                for device_name, future in futures.items():
+                    result = future.result()
+                    if result["error"] is None:
+                        device_neighbors[device_name] = result["neighbors"]
+                    device_stats[device_name] = {
+                        "elapsed": result["elapsed"],
+                        "error": result["error"],
+                        "adjacencies": result["adjacencies"],
+                        "reconnected": result["reconnected"],
+                    }
+                elapsed = time.perf_counter() - start
+                yield {"cycle": cycle, "elapsed": elapsed, "neighbors": device_neighbors, "stats": device_stats}
+                if cycles is None or cycle < cycles:
+                    time.sleep(max(0.0, interval - elapsed))
+    finally:
+        for device in testbed.devices.values():
+            if device.connected:
+                device.disconnect()
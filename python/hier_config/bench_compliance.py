@@ -0,0 +1,163 @@
+"""
+Benchmarks get_hconfig + WorkflowRemediation as config size grows.
+
+Generates synthetic IOS, EOS and NX-OS configs (interfaces, ACLs and
+prefix-lists) from 1k to 1M lines, derives an intended config with a given
+percentage of drifted lines, and times parsing, the diff and
+remediation_config_filtered_text separately. Results are written as JSON so
+runs can be compared across hier_config versions.
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import time
+from datetime import datetime, timezone
+from importlib.metadata import version
+
+from hier_config import WorkflowRemediation, get_hconfig
+from hier_config.utils import hconfig_v2_os_v3_platform_mapper
+
+from streaming_loader import load_hconfig
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DRIFTS = (0.0, 1.0, 10.0) # Percent of lines changed between running and intended
+PLATFORMS = ("ios", "eos", "nxos")
+RUNS = 1
+OUTPUT_FILE = "bench_compliance.json"
+
+INTERFACE_NAMES = {
+    "ios": "GigabitEthernet0/0/{}",
+    "eos": "Ethernet{}",
+    "nxos": "Ethernet1/{}",
+}
+
+
+def _interface(os_name: str, i: int) -> list:
+    return [
+        f"interface {INTERFACE_NAMES[os_name].format(i)}",
+        f" description LINK-{i}",
+        f" ip address 10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255} 255.255.255.254",
+        " no shutdown",
+    ]
+
+
+def _acl(os_name: str, i: int, entries: int = 20) -> list:
+    lines = [f"ip access-list extended ACL-{i}" if os_name == "ios" else f"ip access-list ACL-{i}"]
+    for seq in range(1, entries + 1):
+        lines.append(f" {seq * 10} permit tcp host 192.0.2.{seq} host 198.51.100.{i % 250} eq {1000 + seq}")
+    return lines
+
+
+def _prefix_list(i: int, entries: int = 20) -> list:
+    return [
+        f"ip prefix-list PL-{i} seq {seq * 5} permit 172.{16 + (i & 15)}.{seq}.0/24"
+        for seq in range(1, entries + 1)
+    ]
+
+
+def synthetic_config(os_name: str, size: int) -> list:
+    """Returns about size lines of config, built from whole interface/ACL/prefix-list blocks."""
+    lines = [f"hostname bench-{os_name}"]
+    i = 0
+    while len(lines) < size:
+        block = (_interface(os_name, i), _acl(os_name, i), _prefix_list(i))[i % 3]
+        lines.extend(block)
+        i += 1
+    return lines
+
+
+def drifted(lines: list, drift: float, seed: int = 0) -> list:
+    """Copy of lines where drift percent of the non-section lines are changed or removed."""
+    rng = random.Random(seed)
+    intended = list(lines)
+    # Changing a section header would drift every line under it, keep to leaf lines
+    candidates = [index for index, line in enumerate(lines) if line.startswith(" ") or line.startswith("ip prefix-list")]
+    for index in rng.sample(candidates, min(len(candidates), int(len(lines) * drift / 100))):
+        if rng.random() < 0.5:
+            intended[index] = None
+        else:
+            intended[index] = intended[index].replace("permit", "deny").replace("LINK-", "UPLINK-")
+    return [line for line in intended if line is not None]
+
+
+def _timed(func):
+    gc.collect()
+    start = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - start
+
+
+def bench_case(os_name: str, size: int, drift: float, runs: int = RUNS) -> dict:
+    running_lines = synthetic_config(os_name, size)
+    running_text = "\n".join(running_lines)
+    intended_text = "\n".join(drifted(running_lines, drift))
+    hierconfig_os = hconfig_v2_os_v3_platform_mapper(os_name)
+
+    timings = {name: [] for name in ("parse_running", "parse_intended", "stream_parse_running",
+                                     "stream_parse_intended", "diff", "filtered_text")}
+    remediation_lines = 0
+    for _ in range(runs):
+        # Both parsers get the same two inputs, so their times compare directly
+        running, parse_running = _timed(lambda: get_hconfig(hierconfig_os, running_text))
+        intended, parse_intended = _timed(lambda: get_hconfig(hierconfig_os, intended_text))
+        _, stream_parse_running = _timed(lambda: load_hconfig(hierconfig_os, iter(running_text.splitlines())))
+        _, stream_parse_intended = _timed(lambda: load_hconfig(hierconfig_os, iter(intended_text.splitlines())))
+        hierconfig_wfr = WorkflowRemediation(running, intended)
+        _, diff = _timed(lambda: hierconfig_wfr.remediation_config)
+        text, filtered_text = _timed(
+            lambda: hierconfig_wfr.remediation_config_filtered_text(include_tags={}, exclude_tags={})
+        )
+        remediation_lines = len(text.splitlines())
+        for name, value in (("parse_running", parse_running), ("parse_intended", parse_intended),
+                            ("stream_parse_running", stream_parse_running),
+                            ("stream_parse_intended", stream_parse_intended), ("diff", diff),
+                            ("filtered_text", filtered_text)):
+            timings[name].append(value)
+
+    return {
+        "os": os_name,
+        "lines": len(running_lines),
+        "drift_percent": drift,
+        "remediation_lines": remediation_lines,
+        "seconds": {name: min(values) for name, values in timings.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--drifts", type=float, nargs="+", default=DRIFTS)
+    parser.add_argument("--platforms", nargs="+", default=PLATFORMS, choices=PLATFORMS)
+    parser.add_argument("--runs", type=int, default=RUNS, help="best of N runs per case")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    results = []
+    for os_name in args.platforms:
+        for size in args.sizes:
+            for drift in args.drifts:
+                result = bench_case(os_name, size, drift, args.runs)
+                seconds = result["seconds"]
+                print(f"{os_name:>5} {result['lines']:>9} lines {drift:>5.1f}% drift: "
+                      f"parse {seconds['parse_running'] + seconds['parse_intended']:.3f}s "
+                      f"stream {seconds['stream_parse_running'] + seconds['stream_parse_intended']:.3f}s "
+                      f"diff {seconds['diff']:.3f}s text {seconds['filtered_text']:.3f}s "
+                      f"({result['remediation_lines']} remediation lines)")
+                results.append(result)
+
+    report = {
+        "generated": datetime.now(timezone.utc).isoformat(),
+        "hier_config": version("hier-config"),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
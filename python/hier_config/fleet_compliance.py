@@ -0,0 +1,338 @@
+"""
+Fleet-wide version of hier_compliance.py.
+
+Takes directories (or a manifest) of running/intended configs with a platform
+per device, builds the WorkflowRemediation objects across a process pool and
+writes one remediation file per device plus an aggregate summary.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from importlib.metadata import version
+
+import yaml
+from hier_config import WorkflowRemediation, get_hconfig
+from hier_config.utils import hconfig_v2_os_v3_platform_mapper
+
+from scoped_compliance import scope
+from streaming_loader import load_hconfig
+
+# process_pool.py is shared with the renderers one directory up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from process_pool import map_chunks  # pylint: disable=wrong-import-position
+
+RUNNING_DIR = "running"
+INTENDED_DIR = "intended"
+OUTPUT_DIR = "remediation"
+DEFAULT_OS = "ios"
+MAX_WORKERS = os.cpu_count()
+INTENDED_CACHE_ENTRIES = 256 # Parsed intended trees kept per worker
+INTENDED_CACHE_BYTES = 256 * 1024 * 1024 # Cap on the config text behind the cached trees
+HASH_BLOCK = 1024 * 1024 # Files are hashed in blocks, never read whole
+RESULT_STORE_FILE = "remediation-store.sqlite"
+RESULT_STORE_DAYS = 14 # Stored results unused for this long are dropped
+
+
+class HConfigCache:
+    """
+    LRU cache of parsed HConfig trees keyed by (platform, SHA-256 of the config text).
+    Identical intended configs are parsed once per worker instead of once per device.
+    Cached trees are shared, so they must only be read (WorkflowRemediation does not modify them).
+    """
+
+    def __init__(self, max_entries: int = INTENDED_CACHE_ENTRIES, max_bytes: int = INTENDED_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries = OrderedDict() # key -> (HConfig, size)
+        self._lock = threading.Lock()
+
+    def get(self, platform, config_text: str):
+        key = (platform, hashlib.sha256(config_text.encode()).hexdigest())
+        return self._get(key, len(config_text), lambda: get_hconfig(platform, config_text))
+
+    def get_file(self, platform, path: str, digest: str = None):
+        """Same as get() for a config file, which is hashed and parsed without being read whole."""
+        key = (platform, digest or file_hash(path))
+        return self._get(key, os.path.getsize(path), lambda: load_hconfig(platform, path))
+
+    def _get(self, key: tuple, size: int, parse):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._entries[key][0]
+        hconfig = parse()
+        with self._lock:
+            self.stats["misses"] += 1
+            if key not in self._entries:
+                self._entries[key] = (hconfig, size)
+                self.total_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+                _, (_, size) = self._entries.popitem(last=False)
+                self.total_bytes -= size
+        return hconfig
+
+
+# One cache per worker process
+intended_cache = HConfigCache()
+
+
+class ResultStore:
+    """
+    Persistent (os, running-config hash, intended hash) -> remediation store.
+    A device whose running and intended configs are byte-identical to a previous run
+    gets its stored remediation back instead of being diffed again. Stored results are
+    dropped when the installed hier-config version changes, as its remediation may too.
+    """
+
+    def __init__(self, path: str = RESULT_STORE_FILE, max_age_days: float = RESULT_STORE_DAYS):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " os TEXT, running_hash TEXT, intended_hash TEXT, remediation TEXT, lines INTEGER, used REAL,"
+            " PRIMARY KEY (os, running_hash, intended_hash))"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        hier_config_version = version("hier-config")
+        row = self._db.execute("SELECT value FROM meta WHERE key='hier_config'").fetchone()
+        if row is None or row[0] != hier_config_version:
+            self._db.execute("DELETE FROM results")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('hier_config', ?)", (hier_config_version,))
+        self._db.commit()
+
+    def get(self, os_name: str, running_hash: str, intended_hash: str):
+        """Returns (remediation, lines) or None."""
+        key = (os_name, running_hash, intended_hash)
+        row = self._db.execute(
+            "SELECT remediation, lines FROM results WHERE os=? AND running_hash=? AND intended_hash=?", key
+        ).fetchone()
+        if row is not None:
+            self._db.execute(
+                "UPDATE results SET used=? WHERE os=? AND running_hash=? AND intended_hash=?", (time.time(), *key)
+            )
+        return row
+
+    def put(self, os_name: str, running_hash: str, intended_hash: str, remediation: str, lines: int):
+        self._db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+            (os_name, running_hash, intended_hash, remediation, lines, time.time())
+        )
+
+    def commit(self):
+        """Saves the run and drops results nobody has used for max_age_days."""
+        self._db.execute("DELETE FROM results WHERE used < ?", (time.time() - self.max_age,))
+        self._db.commit()
+
+    def close(self):
+        self.commit()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def manifest_from_dirs(running_dir: str = RUNNING_DIR, intended_dir: str = INTENDED_DIR, platforms: dict = None,
+                       default_os: str = DEFAULT_OS) -> dict:
+    """
+    Pairs <running_dir>/<device>.txt with <intended_dir>/<device>.txt.
+    platforms maps device -> hier_config OS ('ios', 'iosxr', 'nxos', 'eos', ...).
+    """
+    platforms = platforms or {}
+    manifest = {}
+    for file_name in sorted(os.listdir(running_dir)):
+        device, ext = os.path.splitext(file_name)
+        if ext != ".txt":
+            continue
+        manifest[device] = {
+            "os": platforms.get(device, default_os),
+            "running": os.path.join(running_dir, file_name),
+            "intended": os.path.join(intended_dir, file_name),
+        }
+    return manifest
+
+
+def load_manifest(manifest_file: str) -> dict:
+    """
+    Reads {device: {"os": "ios", "running": path, "intended": path}} from a YAML or JSON file.
+    Also used for the {device: os} platforms map given to manifest_from_dirs().
+    """
+    with open(manifest_file, "r") as f:
+        return yaml.safe_load(f)
+
+
+def remediate_device(device: str, entry: dict, sections=None) -> dict:
+    """
+    Builds the remediation for one device. Never raises, errors are reported in the result.
+    With sections (e.g. {"snmp-server"}), only the matching top-level sections are diffed.
+    """
+    result = {"device": device, "os": entry.get("os", DEFAULT_OS), "remediation": None, "lines": 0,
+              "elapsed": 0.0, "error": None, "cached": False}
+    start = time.perf_counter()
+    try:
+        # Both configs are streamed into their trees line by line instead of read whole
+        for path in (entry["running"], entry["intended"]):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No such file: '{path}'")
+
+        try:
+            hierconfig_os = hconfig_v2_os_v3_platform_mapper(result["os"])
+
+            hierconfig_running_config = load_hconfig(hierconfig_os, entry["running"])
+            hierconfig_intended_config = intended_cache.get_file(hierconfig_os, entry["intended"])
+            if sections:
+                hierconfig_running_config = scope(hierconfig_running_config, sections)
+                hierconfig_intended_config = scope(hierconfig_intended_config, sections)
+            hierconfig_wfr = WorkflowRemediation(
+                hierconfig_running_config,
+                hierconfig_intended_config,
+            )
+        except Exception as err:  # pylint: disable=broad-except:
+            raise Exception(  # pylint: disable=broad-exception-raised
+                f"Cannot instantiate HierConfig on {device}, check Device, Platform and Hier Options. "
+                f"Original error: {err}"
+            ) from err
+
+        remediation_config = hierconfig_wfr.remediation_config_filtered_text(include_tags={}, exclude_tags={})
+        result["remediation"] = remediation_config
+        result["lines"] = len(remediation_config.splitlines())
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def _remediate_chunk(chunk: list, sections=None) -> list:
+    return [remediate_device(device, entry, sections) for device, entry in chunk]
+
+
+def remediate_fleet(manifest: dict, max_workers: int = MAX_WORKERS, store: ResultStore = None,
+                    sections=None) -> list:
+    """
+    Runs remediate_device for every manifest entry on a process pool.
+    Devices go to workers in chunks to keep the pickling overhead per device low, sorted
+    by intended file so devices sharing an intended config land on the same worker's cache.
+    With a ResultStore, devices whose configs are unchanged since a previous run are not
+    diffed again, their results are marked "cached". sections limits the diff to matching
+    top-level sections, see scoped_compliance.py. Results are returned in manifest order.
+    """
+    sections = sorted(sections) if sections else None
+    # Scoped results are stored apart from full ones
+    scope_key = f"[{','.join(sections)}]" if sections else ""
+    hashes = {device: _file_hashes(entry) for device, entry in manifest.items()}
+    results = []
+    pending = {}
+    for device, entry in manifest.items():
+        os_name = entry.get("os", DEFAULT_OS)
+        stored = store.get(os_name + scope_key, *hashes[device]) if store is not None and None not in hashes[device] else None
+        if stored is None:
+            pending[device] = entry
+            continue
+        remediation, lines = stored
+        results.append({"device": device, "os": os_name, "remediation": remediation, "lines": lines,
+                        "elapsed": 0.0, "error": None, "cached": True})
+
+    items = sorted(pending.items(), key=lambda item: (item[1].get("os", DEFAULT_OS), hashes[item[0]][1] or ""))
+    for chunk_results in map_chunks(_remediate_chunk, items, sections, max_workers=max_workers):
+        results.extend(chunk_results)
+        if store is None:
+            continue
+        for result in chunk_results:
+            if result["error"] is None and None not in hashes[result["device"]]:
+                store.put(result["os"] + scope_key, *hashes[result["device"]], result["remediation"], result["lines"])
+    if store is not None:
+        store.commit()
+    order = {device: index for index, device in enumerate(manifest)}
+    return sorted(results, key=lambda result: order[result["device"]])
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_hashes(entry: dict) -> tuple:
+    """(running hash, intended hash) of a manifest entry, None for a missing file."""
+    hashes = []
+    for path in (entry["running"], entry["intended"]):
+        try:
+            hashes.append(file_hash(path))
+        except OSError:
+            hashes.append(None) # remediate_device reports the missing file
+    return tuple(hashes)
+
+
+def summarize(results: list) -> dict:
+    return {
+        "devices": len(results),
+        "compliant": sum(1 for result in results if result["error"] is None and result["lines"] == 0),
+        "non_compliant": sum(1 for result in results if result["error"] is None and result["lines"] > 0),
+        "errors": sum(1 for result in results if result["error"]),
+        "cached": sum(1 for result in results if result.get("cached")),
+        "remediation_lines": sum(result["lines"] for result in results),
+        "elapsed": sum(result["elapsed"] for result in results),
+    }
+
+
+def write_results(results: list, output_dir: str = OUTPUT_DIR) -> dict:
+    """Writes <device>.txt remediation files and a summary.json with per-device status."""
+    os.makedirs(output_dir, exist_ok=True)
+    for result in results:
+        remediation_file = os.path.join(output_dir, f"{result['device']}.txt")
+        if result["remediation"]:
+            with open(remediation_file, "w") as f:
+                f.write(result["remediation"])
+        elif result["error"] is None and os.path.exists(remediation_file):
+            # Compliant now, drop the remediation left over from an earlier run.
+            # A device that errored keeps its last known remediation.
+            os.remove(remediation_file)
+    summary = {
+        "summary": summarize(results),
+        "devices": {
+            result["device"]: {key: value for key, value in result.items() if key not in ("device", "remediation")}
+            for result in results
+        },
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fleet-wide hier_config remediation.")
+    parser.add_argument("--manifest", help="YAML/JSON file of {device: {os, running, intended}}")
+    parser.add_argument("--platforms", help="YAML/JSON file of {device: hier_config OS}, used with the directories")
+    parser.add_argument("--default-os", default=DEFAULT_OS, help=f"OS of devices with none given (default {DEFAULT_OS})")
+    parser.add_argument("--running-dir", default=RUNNING_DIR)
+    parser.add_argument("--intended-dir", default=INTENDED_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    if args.manifest:
+        manifest = load_manifest(args.manifest)
+        for entry in manifest.values():
+            entry.setdefault("os", args.default_os)
+    else:
+        platforms = load_manifest(args.platforms) if args.platforms else None
+        manifest = manifest_from_dirs(args.running_dir, args.intended_dir, platforms, args.default_os)
+
+    start = time.perf_counter()
+    with ResultStore() as store:
+        results = remediate_fleet(manifest, store=store)
+    summary = write_results(results, args.output_dir)
+    print(f"{summary['summary']} in {time.perf_counter() - start:.2f}s")
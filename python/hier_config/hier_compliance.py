@@ -1,23 +1,23 @@
-from hier_config import WorkflowRemediation, get_hconfig
+from hier_config import WorkflowRemediation
 from hier_config.utils import hconfig_v2_os_v3_platform_mapper, load_hconfig_v2_options
+from streaming_loader import load_hconfig
 
 # try:
 #         remediation_setting_obj = RemediationSetting.objects.get(platform=obj.rule.platform)
 #     except Exception as err:  # pylint: disable=broad-except:
 #         raise ValidationError(f"Platform {obj.device.platform.name} has no Remediation Settings defined.") from err
 
-with open("actual.txt", "r") as f:
-    actual = f.read()
-with open("intended.txt", "r") as f:
-    intended = f.read()
+# Configs are streamed into the hierarchy line by line instead of read whole into memory
+actual = "actual.txt"
+intended = "intended.txt"
 hierconfig_os = "ios"
 
 try:
     
     hierconfig_os = hconfig_v2_os_v3_platform_mapper(hierconfig_os)
 
-    hierconfig_running_config = get_hconfig(hierconfig_os, actual)
-    hierconfig_intended_config = get_hconfig(hierconfig_os, intended)
+    hierconfig_running_config = load_hconfig(hierconfig_os, actual)
+    hierconfig_intended_config = load_hconfig(hierconfig_os, intended)
     hierconfig_wfr = WorkflowRemediation(
         hierconfig_running_config,
         hierconfig_intended_config,
@@ -0,0 +1,58 @@
+"""
+Section-scoped compliance checks.
+
+Often only one feature matters (e.g. the 'snmp-server' lines in intended.txt).
+The top-level lines of the running config are indexed by their first token,
+so the sections matching the requested matchers are found without walking the
+whole config, and only those subtrees are diffed.
+"""
+from hier_config import WorkflowRemediation
+from hier_config.root import HConfig
+from hier_config.utils import hconfig_v2_os_v3_platform_mapper
+
+from streaming_loader import load_hconfig
+
+SECTIONS = {"snmp-server"}
+
+
+def section_index(config: HConfig) -> dict:
+    """{first token: [top-level children]} for a parsed config."""
+    index = {}
+    for child in config.children:
+        index.setdefault(child.text.split(" ", 1)[0], []).append(child)
+    return index
+
+
+def scope(config: HConfig, matchers, index: dict = None) -> HConfig:
+    """
+    Returns a new HConfig holding only the top-level sections matched by matchers.
+    A matcher is one or more leading words, e.g. 'snmp-server' or 'snmp-server traps'.
+    """
+    index = section_index(config) if index is None else index
+    scoped = HConfig(config.driver)
+    copied = set() # Overlapping matchers such as 'snmp-server' and 'snmp-server traps'
+    for matcher in matchers:
+        for child in index.get(matcher.split(" ", 1)[0], ()):
+            if child.text in copied:
+                continue
+            if child.text == matcher or child.text.startswith(matcher + " "):
+                scoped.add_deep_copy_of(child)
+                copied.add(child.text)
+    return scoped
+
+
+def scoped_remediation(hierconfig_os: str, running, intended, matchers) -> str:
+    """
+    Remediation for the matched sections only. running and intended are anything
+    load_hconfig() reads (paths, file objects, sockets).
+    """
+    platform = hconfig_v2_os_v3_platform_mapper(hierconfig_os)
+    hierconfig_wfr = WorkflowRemediation(
+        scope(load_hconfig(platform, running), matchers),
+        scope(load_hconfig(platform, intended), matchers),
+    )
+    return hierconfig_wfr.remediation_config_filtered_text(include_tags={}, exclude_tags={})
+
+
+if __name__ == "__main__":
+    print(scoped_remediation("ios", "actual.txt", "intended.txt", SECTIONS))
@@ -0,0 +1,220 @@
+"""
+Streaming front end for hier_config.
+
+get_hconfig() needs the whole config as one string and then splits it into a
+list of lines, so a 500k-line running config sits in memory several times
+over. load_hconfig() reads the config line by line from a path, file or
+socket and builds the HConfig tree as it goes, following the same rules as
+get_hconfig() (per-line substitutions, indent adjustments, banners, sectional
+exits and post-load callbacks). Line text is interned, so repeated lines such
+as ' no shutdown' under thousands of interfaces share one string.
+
+Platforms that need the whole text up front (full-text substitutions or a
+config preprocessor, e.g. Junos set conversion) fall back to get_hconfig().
+
+The loop mirrors hier_config's private _load_from_string_lines() as of
+hier-config 3.7.1. After upgrading hier-config, run this file: it loads the
+samples below both ways and fails if the trees differ.
+"""
+import io
+import sys
+from importlib.metadata import version
+from re import search, sub
+
+from hier_config import get_hconfig
+from hier_config.platforms.driver_base import HConfigDriverBase
+from hier_config.utils import hconfig_v2_os_v3_platform_mapper
+
+MIRRORED_VERSION = "3.7.1" # hier-config release whose loader load_hconfig() follows
+
+
+def iter_lines(source, encoding: str = "utf-8"):
+    """Yields lines without line endings from a path, a text or binary file object, or a socket."""
+    if isinstance(source, str):
+        with open(source, "r", encoding=encoding, errors="ignore") as f:
+            for line in f:
+                yield line.rstrip("\r\n")
+        return
+    if hasattr(source, "makefile"):
+        source = source.makefile("rb")
+    if isinstance(source, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(source, "mode", ""):
+        source = io.TextIOWrapper(source, encoding=encoding, errors="ignore")
+    for line in source:
+        yield line.rstrip("\r\n")
+
+
+def supports_streaming(driver: HConfigDriverBase) -> bool:
+    return (
+        not driver.rules.full_text_sub
+        and type(driver).config_preprocessor is HConfigDriverBase.config_preprocessor
+    )
+
+
+def _end_of_banner(line: str, banner_end_lines: set, banner_end_contains: list) -> bool:
+    if line.startswith("^") or line in banner_end_lines:
+        return True
+    return any(c in line for c in banner_end_contains)
+
+
+def load_hconfig(platform, source, encoding: str = "utf-8"):
+    """Builds an HConfig tree from a config read incrementally from source."""
+    config = get_hconfig(platform)
+    driver = config.driver
+    if not supports_streaming(driver):
+        return get_hconfig(platform, "\n".join(iter_lines(source, encoding)))
+
+    current_section = config
+    most_recent_item = config
+    indent_adjust = 0
+    end_indent_adjust = []
+    temp_banner = []
+    banner_end_lines = {"EOF", "%", "!"}
+    banner_end_contains = []
+    in_banner = False
+
+    for line in iter_lines(source, encoding):
+        # Banners are folded into a single child, as get_hconfig() does
+        if in_banner:
+            if line != "!":
+                temp_banner.append(line)
+            if _end_of_banner(line, banner_end_lines, banner_end_contains):
+                in_banner = False
+                most_recent_item = config.add_child("\n".join(temp_banner))
+                most_recent_item.real_indent_level = 0
+                current_section = config
+                temp_banner = []
+            continue
+
+        if line.startswith("banner ") and line != "banner motd ##":
+            in_banner = True
+            temp_banner.append(line)
+            banner_words = line.split()
+            if len(banner_words) > 2:
+                banner_end_contains.append(banner_words[2])
+                if banner_words[2].startswith('"'):
+                    banner_end_contains.append('"')
+                banner_end_lines.add(banner_words[2][:1])
+                banner_end_lines.add(banner_words[2][:2])
+            continue
+
+        actual_indent = len(line) - len(line.lstrip())
+        line = " " * actual_indent + " ".join(line.split())
+        for rule in driver.rules.per_line_sub:
+            line = sub(rule.search, rule.replace, line)
+        line = line.rstrip()
+        if not line:
+            continue
+
+        this_indent = len(line) - len(line.lstrip()) + indent_adjust
+        line = sys.intern(line.lstrip())
+
+        # Walk back up the tree, then down by one step if this line is indented further
+        while this_indent <= current_section.real_indent_level:
+            current_section = current_section.parent
+        if this_indent > most_recent_item.real_indent_level:
+            current_section = most_recent_item
+        most_recent_item = current_section.add_child(line)
+        most_recent_item.real_indent_level = this_indent
+
+        for expression in driver.rules.indent_adjust:
+            if search(expression.start_expression, line):
+                indent_adjust += 1
+                end_indent_adjust.append(expression.end_expression)
+                break
+        if end_indent_adjust and search(end_indent_adjust[0], line):
+            indent_adjust -= 1
+            end_indent_adjust.pop(0)
+
+    if in_banner:
+        raise ValueError("we are still in a banner for some reason")
+
+    for child in tuple(config.all_children()):
+        child.delete_sectional_exit()
+    for callback in driver.rules.post_load_callbacks:
+        callback(config)
+    return config
+
+
+# Parity samples: banners, nested sections, per-line subs and the XR template indent adjust
+PARITY_SAMPLES = {
+    "ios": """hostname r1
+banner motd ^C
+Authorized access only
+^C
+interface GigabitEthernet0/0/1
+ description  uplink   to core
+ ip address 10.0.0.1 255.255.255.254
+ no shutdown
+router bgp 65000
+ address-family ipv4 unicast
+  neighbor 10.0.0.0 activate
+ exit-address-family
+ip access-list extended MGMT
+ 10 permit tcp any any eq 22
+snmp-server community public RO
+""",
+    "iosxr": """hostname r1
+banner motd ^
+Authorized access only
+^
+telemetry model-driven
+ sensor-group CPU
+  sensor-path Cisco-IOS-XR-wdsysmon-fd-oper:system-monitoring/cpu-utilization
+  !
+ !
+template BASE
+ logging console disable
+end-template
+router bgp 65000
+ neighbor 10.0.0.0
+  remote-as 65001
+  address-family ipv4 unicast
+   route-policy PASS in
+  !
+ !
+!
+""",
+    "nxos": """hostname n1
+feature bgp
+interface Ethernet1/1
+  description uplink
+  no switchport
+  ip address 10.0.0.1/31
+  no shutdown
+router bgp 65000
+  neighbor 10.0.0.0
+    remote-as 65001
+    address-family ipv4 unicast
+""",
+    "eos": """hostname e1
+interface Ethernet1
+   description uplink
+   no switchport
+   ip address 10.0.0.1/31
+router bgp 65000
+   neighbor 10.0.0.0 remote-as 65001
+   address-family ipv4
+      neighbor 10.0.0.0 activate
+""",
+}
+
+
+def parity_check(samples: dict = None) -> list:
+    """Loads each sample with load_hconfig() and get_hconfig(); returns the OS names whose trees differ."""
+    mismatches = []
+    for hierconfig_os, config_text in (samples or PARITY_SAMPLES).items():
+        platform = hconfig_v2_os_v3_platform_mapper(hierconfig_os)
+        streamed = load_hconfig(platform, io.StringIO(config_text))
+        expected = get_hconfig(platform, config_text)
+        if streamed.dump() != expected.dump():
+            mismatches.append(hierconfig_os)
+    return mismatches
+
+
+if __name__ == "__main__":
+    installed = version("hier-config")
+    mismatches = parity_check()
+    if mismatches:
+        sys.exit(f"load_hconfig() differs from get_hconfig() on hier-config {installed} for: {', '.join(mismatches)}. "
+                 f"Update it from hier_config's _load_from_string_lines() (mirrored from {MIRRORED_VERSION}).")
+    print(f"load_hconfig() matches get_hconfig() on hier-config {installed} for {', '.join(PARITY_SAMPLES)}")
@@ -0,0 +1,98 @@
+"""
+Per-team views of one remediation.
+
+remediation_config_filtered_text() walks (and sorts) the whole remediation
+tree on every call, so producing a security, a NOC and a monitoring view
+costs three full traversals. TagIndex walks the remediation once, keeping the
+rendered lines in output order and a tag -> leaf positions index; every view
+after that is a few set operations plus its own output lines.
+"""
+from hier_config import WorkflowRemediation
+from hier_config.models import MatchRule, TagRule
+from hier_config.utils import hconfig_v2_os_v3_platform_mapper
+
+from streaming_loader import load_hconfig
+
+TAG_RULES = (
+    TagRule(match_rules=(MatchRule(startswith=("aaa", "crypto", "ip access-list", "line vty", "username")),),
+            apply_tags=frozenset({"security"})),
+    TagRule(match_rules=(MatchRule(startswith=("snmp-server", "logging", "ntp")),),
+            apply_tags=frozenset({"monitoring"})),
+    TagRule(match_rules=(MatchRule(startswith=("interface", "router", "ip route", "vlan")),),
+            apply_tags=frozenset({"noc"})),
+)
+
+# View name -> (include_tags, exclude_tags), same meaning as in remediation_config_filtered_text()
+VIEWS = {
+    "security": ({"security"}, set()),
+    "noc": ({"noc"}, set()),
+    "monitoring": ({"monitoring"}, set()),
+    "untagged": (set(), {"security", "noc", "monitoring"}),
+}
+
+
+class TagIndex:
+    """Rendered remediation lines plus a tag -> leaf positions index, built in one traversal."""
+
+    def __init__(self, config):
+        self.lines = [] # cisco_style_text() of every node, in remediation_config_filtered_text() order
+        self.parents = [] # Position of each node's parent, None at the top level
+        self.leaves = set()
+        self.index = {} # tag -> positions of the leaves carrying it
+        self._walk(config, None)
+
+    def _walk(self, node, parent):
+        for child in sorted(node.children):
+            position = len(self.lines)
+            self.lines.append(child.cisco_style_text())
+            self.parents.append(parent)
+            if child.children:
+                self._walk(child, position)
+            else:
+                self.leaves.add(position)
+                # Tags live on the leaves (tags_add() pushes them down), branches are included through them
+                for tag in child.tags:
+                    self.index.setdefault(tag, set()).add(position)
+
+    def tagged(self, tags) -> set:
+        found = set()
+        for tag in tags:
+            found |= self.index.get(tag, set())
+        return found
+
+    def text(self, include_tags=(), exclude_tags=()) -> str:
+        """Same output as remediation_config_filtered_text(include_tags, exclude_tags)."""
+        if not include_tags and not exclude_tags:
+            return "\n".join(self.lines)
+        selected = self.tagged(include_tags) if include_tags else set(self.leaves)
+        if exclude_tags:
+            selected -= self.tagged(exclude_tags)
+        # A section header is printed when any leaf below it is
+        for position in list(selected):
+            parent = self.parents[position]
+            while parent is not None and parent not in selected:
+                selected.add(parent)
+                parent = self.parents[parent]
+        return "\n".join(self.lines[position] for position in sorted(selected))
+
+    def views(self, views: dict = None) -> dict:
+        """{view name: remediation text} for every view in views (VIEWS by default)."""
+        views = VIEWS if views is None else views
+        return {name: self.text(include, exclude) for name, (include, exclude) in views.items()}
+
+
+def tagged_views(hierconfig_wfr: WorkflowRemediation, tag_rules=TAG_RULES, views: dict = None) -> dict:
+    """Tags the remediation once and returns every view from a single traversal."""
+    hierconfig_wfr.apply_remediation_tag_rules(tag_rules)
+    return TagIndex(hierconfig_wfr.remediation_config).views(views)
+
+
+if __name__ == "__main__":
+    hierconfig_os = hconfig_v2_os_v3_platform_mapper("ios")
+    hierconfig_wfr = WorkflowRemediation(
+        load_hconfig(hierconfig_os, "actual.txt"),
+        load_hconfig(hierconfig_os, "intended.txt"),
+    )
+    for name, text in tagged_views(hierconfig_wfr).items():
+        print(f"! ---- {name} ----")
+        print(text)
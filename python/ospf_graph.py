@@ -0,0 +1,108 @@
+# ospf_graph.py
+"""
+Fleet-wide OSPF adjacency graph built on the output of gather_ospf_neighbors.py.
+
+Neighbor IPs (router IDs or interface addresses) are mapped to devices through
+an index, so one-sided adjacencies can be found without comparing every device
+against every other one. Re-polls only touch the devices whose neighbors changed.
+"""
+from pyats.topology import Testbed
+
+def ip_index_from_testbed(testbed: Testbed) -> dict:
+    """Builds {ip: device_name} from interface IPv4 addresses and custom 'router_id' keys in the testbed."""
+    index = {}
+    for device_name, device in testbed.devices.items():
+        router_id = device.custom.get("router_id") if device.custom else None
+        if router_id:
+            index[str(router_id)] = device_name
+        for interface in device.interfaces.values():
+            if getattr(interface, "ipv4", None) is not None:
+                index[str(interface.ipv4.ip)] = device_name
+    return index
+
+class OspfGraph:
+    """Directed adjacency graph: an edge a -> b means a sees b as a neighbor."""
+
+    def __init__(self, ip_index: dict = None):
+        self.ip_index = dict(ip_index or {})
+        self.neighbor_ips = {}  # device -> frozenset of neighbor IPs as last polled
+        self.edges = {}  # device -> set of neighbor devices
+        self.incoming = {}  # device -> set of devices that list it as a neighbor
+        self.unresolved = {}  # device -> set of neighbor IPs missing from the index
+        self.one_sided = set()  # (a, b) where a sees b but b, which was polled, does not see a
+
+    def _refresh_pair(self, a: str, b: str):
+        """Recomputes the one-sided status of a -> b and b -> a."""
+        for x, y in ((a, b), (b, a)):
+            if y in self.edges.get(x, ()) and y in self.neighbor_ips and x not in self.edges.get(y, ()):
+                self.one_sided.add((x, y))
+            else:
+                self.one_sided.discard((x, y))
+
+    def _set_edges(self, device: str, neighbors: set) -> tuple:
+        old = self.edges.get(device, set())
+        for neighbor in old - neighbors:
+            self.incoming[neighbor].discard(device)
+        for neighbor in neighbors - old:
+            self.incoming.setdefault(neighbor, set()).add(device)
+        self.edges[device] = neighbors
+        for other in old | neighbors | self.incoming.get(device, set()):
+            self._refresh_pair(device, other)
+        return neighbors - old, old - neighbors
+
+    def update(self, device_neighbors: dict) -> dict:
+        """
+        Applies a poll result in the {device: [neighbor_ips]} format of gather_neighbors.
+        Devices missing from the dict are left as they were, unchanged devices are skipped.
+        Returns the adjacencies that appeared and disappeared with this poll.
+        """
+        changes = {"added": [], "removed": [], "changed_devices": []}
+        for device, ips in device_neighbors.items():
+            ips = frozenset(ips)
+            if self.neighbor_ips.get(device) == ips:
+                continue
+            self.neighbor_ips[device] = ips
+            neighbors = set()
+            unresolved = set()
+            for ip in ips:
+                neighbor = self.ip_index.get(ip)
+                if neighbor is None:
+                    unresolved.add(ip)
+                elif neighbor != device:
+                    neighbors.add(neighbor)
+            self.unresolved[device] = unresolved
+            added, removed = self._set_edges(device, neighbors)
+            changes["added"].extend((device, neighbor) for neighbor in sorted(added))
+            changes["removed"].extend((device, neighbor) for neighbor in sorted(removed))
+            changes["changed_devices"].append(device)
+        return changes
+
+    def remove_device(self, device: str):
+        """Forgets a device's own poll result, adjacencies pointing at it from others remain."""
+        if device not in self.neighbor_ips:
+            return
+        self._set_edges(device, set())
+        del self.neighbor_ips[device]
+        del self.edges[device]
+        self.unresolved.pop(device, None)
+        for other in self.incoming.get(device, set()):
+            self._refresh_pair(device, other)
+
+    def neighbors(self, device: str) -> set:
+        return set(self.edges.get(device, ()))
+
+    def adjacencies(self) -> set:
+        """Two-way adjacencies as sorted (a, b) pairs."""
+        return {
+            tuple(sorted((a, b)))
+            for a, neighbors in self.edges.items()
+            for b in neighbors
+            if a in self.edges.get(b, ())
+        }
+
+    def one_sided_adjacencies(self) -> list:
+        return sorted(self.one_sided)
+
+    def unresolved_neighbors(self) -> dict:
+        """Neighbor IPs that could not be mapped to a device, usually devices outside the testbed."""
+        return {device: sorted(ips) for device, ips in self.unresolved.items() if ips}
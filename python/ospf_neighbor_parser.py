@@ -0,0 +1,51 @@
+# ospf_neighbor_parser.py
+import re
+
+# One row of IOS/IOS-XE 'show ip ospf neighbor':
+# Neighbor ID     Pri   State           Dead Time   Address         Interface
+# 10.0.0.2          1   FULL/DR         00:00:38    192.168.1.2     GigabitEthernet0/1
+# 10.0.0.3          0   FULL/  -        00:00:33    10.1.1.3        GigabitEthernet0/2
+# Lines may end in \r\n, as in pyATS/unicon device.execute() output
+OSPF_NEIGHBOR_RE = re.compile(
+    r"^[ \t]*(\d{1,3}(?:\.\d{1,3}){3})[ \t]+(\d+)[ \t]+([A-Z0-9\-]+)(?:/[ \t]*(\S+))?"
+    r"[ \t]+(\S+)[ \t]+(\d{1,3}(?:\.\d{1,3}){3})[ \t]+(\S+)[ \t\r]*$",
+    re.MULTILINE,
+)
+
+class OspfNeighbor:
+    """One OSPF adjacency. Uses __slots__ to keep thousands of rows compact."""
+    __slots__ = ("neighbor_id", "priority", "state", "role", "dead_time", "address", "interface")
+
+    def __init__(self, neighbor_id: str, priority: int, state: str, role: str, dead_time: str, address: str,
+                 interface: str):
+        self.neighbor_id = neighbor_id
+        self.priority = priority
+        self.state = state
+        self.role = role
+        self.dead_time = dead_time
+        self.address = address
+        self.interface = interface
+
+    @property
+    def is_full(self) -> bool:
+        return self.state == "FULL"
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, OspfNeighbor) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return f"OspfNeighbor({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
+
+def parse_ospf_neighbors(output: str) -> list:
+    """Parses every adjacency, in any state, out of 'show ip ospf neighbor' in a single pass."""
+    return [
+        OspfNeighbor(neighbor_id, int(priority), state, role or "-", dead_time, address, interface)
+        for neighbor_id, priority, state, role, dead_time, address, interface in OSPF_NEIGHBOR_RE.findall(output)
+    ]
+
+def full_neighbor_ids(neighbors: list) -> list:
+    """Neighbor IDs of FULL adjacencies, the list gather_neighbors has always returned."""
+    return [neighbor.neighbor_id for neighbor in neighbors if neighbor.is_full]
@@ -0,0 +1,75 @@
+"""
+Streaming writer for large command output (e.g. 50 MB 'show tech').
+
+Each chunk received from the device is decoded incrementally and written
+straight to the output file, optionally gzip or zstd compressed, so memory
+stays flat whatever the size of the output.
+"""
+import codecs
+import gzip
+
+try:
+    import zstandard
+except ImportError: # zstd compression is optional
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class StreamWriter:
+    """
+    File-like sink for raw device bytes.
+    Output is written as UTF-8 text, invalid bytes are dropped like errors='ignore'.
+    """
+
+    def __init__(self, path: str, compression: str = None, echo: bool = False):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression '{compression}', use one of {list(COMPRESSION_SUFFIXES)}")
+        self.path = path + COMPRESSION_SUFFIXES[compression]
+        self.echo = echo # Also print the decoded text as it arrives
+        self.bytes_written = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self._raw = None
+        if compression == "gzip":
+            self._file = gzip.open(self.path, 'wb')
+        elif compression == "zstd":
+            if zstandard is None:
+                raise ImportError("zstd compression requires the 'zstandard' package")
+            self._raw = open(self.path, 'wb')
+            self._file = zstandard.ZstdCompressor().stream_writer(self._raw)
+        else:
+            self._file = open(self.path, 'wb')
+
+    def write(self, chunk: bytes):
+        # The decoder holds back a multi-byte character split across two chunks
+        self._write_text(self._decoder.decode(chunk))
+
+    def write_text(self, text: str):
+        """Writes a header or separator line between command outputs."""
+        self.flush_decoder()
+        self._write_text(text)
+
+    def _write_text(self, text: str):
+        if not text:
+            return
+        if self.echo:
+            print(text, end='')
+        data = text.encode('utf-8')
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def flush_decoder(self):
+        self._write_text(self._decoder.decode(b'', final=True))
+        self._decoder.reset()
+
+    def close(self):
+        self.flush_decoder()
+        self._file.close()
+        if self._raw is not None:
+            self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,526 @@
+"""
+Concurrent multi-device collection engine built from paramiko_example2.py.
+
+Devices are collected on a bounded thread pool instead of one after another,
+so a fleet-wide 'show run' pull takes about as long as the slowest device.
+Concurrency is capped in total (pool size), per site and per host.
+Commands run over an interactive shell by default, or over one exec channel
+per command with mode='exec'.
+"""
+import argparse
+import getpass
+import os
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+import paramiko
+
+from command_cache import CommandCache
+from output_writer import StreamWriter
+
+devices = {
+    'lax-edg-r1': {'ip': '192.168.2.51', 'site': 'lax', 'platform': 'cisco_ios'},
+    'lax-edg-r2': {'ip': '192.168.2.52', 'site': 'lax', 'platform': 'cisco_ios'}
+}
+commands = ['show version', 'show run']
+
+max_buffer = 65535 # Max bytes to read at once from the SSH buffer
+NETWORK_TIMEOUT = 10 # General timeout for network operations in seconds
+COMMAND_TIMEOUT = 60 # Max seconds to wait for the prompt to come back after a command
+MAX_OUTPUT_BYTES = 64 * 1024 * 1024 # Cap on the output of a single command
+
+# Matches any IOS/XR/NX-OS/EOS style prompt at the end of the buffer, e.g. 'lax-edg-r1#' or 'RP/0/RP0/CPU0:r1#'
+GENERIC_PROMPT = re.compile(rb"([\w.\-@/:]+)(?:\([^)]*\))?[#>$]\s*$")
+
+MAX_SESSIONS_TOTAL = 50
+MAX_SESSIONS_PER_SITE = 10
+MAX_SESSIONS_PER_HOST = 1
+
+# Collection modes: 'shell' screen-scrapes an interactive PTY, 'exec' runs each
+# command on its own exec channel and falls back to the shell when unsupported
+COLLECTION_MODES = ("shell", "exec")
+# Platforms whose SSH server has no usable exec channel, always collected over the shell
+SHELL_ONLY_PLATFORMS = {"cisco_asa", "cisco_wlc", "paloalto_panos", "fortinet"}
+
+
+@dataclass
+class CommandResult:
+    """Output of a single command run on a device."""
+    command: str
+    output: str = "" # Empty when the output was streamed to a file
+    elapsed: float = 0.0
+    size: int = 0 # Bytes received from the device
+    cached: bool = False # True if the output came from a CommandCache
+
+
+@dataclass
+class DeviceResult:
+    """Everything collected from one device, including timings and errors."""
+    device: str
+    host: str
+    site: Optional[str] = None
+    results: list = field(default_factory=list)
+    connect_time: float = 0.0
+    elapsed: float = 0.0
+    error: Optional[str] = None # Exception class name, e.g. 'AuthenticationException'
+    error_message: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def output(self, command: str) -> Optional[str]:
+        """Returns the output of a command, or None if it was not collected."""
+        for result in self.results:
+            if result.command == command:
+                return result.output
+        return None
+
+
+class CollectorError(Exception):
+    """Base class for errors raised while reading from a device."""
+
+    def __init__(self, message: str, output: bytes = b""):
+        super().__init__(message)
+        self.output = output # Whatever was received before the error
+
+
+class CommandTimeout(CollectorError):
+    """The device prompt did not come back before the command timeout."""
+
+
+class OutputLimitExceeded(CollectorError):
+    """A command produced more output than the byte-count cap allows."""
+
+
+class ExecNotSupported(CollectorError):
+    """The device refused to open an exec channel for a command."""
+
+
+class SessionLimiter:
+    """
+    Caps concurrent SSH sessions per host and per site.
+    The overall limit is enforced by the size of the worker pool.
+    """
+
+    def __init__(self, per_host: int = MAX_SESSIONS_PER_HOST, per_site: int = MAX_SESSIONS_PER_SITE):
+        self.per_host = per_host
+        self.per_site = per_site
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._sites = {}
+
+    def _semaphore(self, table: dict, key: str, limit: int) -> threading.Semaphore:
+        with self._lock:
+            if key not in table:
+                table[key] = threading.BoundedSemaphore(limit)
+            return table[key]
+
+    def acquire(self, host: str, site: Optional[str] = None):
+        """Blocks until a session slot is free for both the site and the host."""
+        if site is not None:
+            self._semaphore(self._sites, site, self.per_site).acquire()
+        self._semaphore(self._hosts, host, self.per_host).acquire()
+
+    def release(self, host: str, site: Optional[str] = None):
+        self._semaphore(self._hosts, host, self.per_host).release()
+        if site is not None:
+            self._semaphore(self._sites, site, self.per_site).release()
+
+
+def compile_prompt(hostname: str) -> re.Pattern:
+    """
+    Builds a regex matching the device prompt at the end of the buffer.
+    Also matches config-mode prompts such as 'lax-edg-r1(config-if)#'.
+    """
+    return re.compile(re.escape(hostname.encode()) + rb"(?:\([^)]*\))?[#>$]\s*$")
+
+
+def stream_until_prompt(connection, prompt: re.Pattern, write, timeout: float = COMMAND_TIMEOUT,
+                        max_bytes: int = MAX_OUTPUT_BYTES) -> int:
+    """
+    Reads from the channel until the prompt shows up at the end of the output,
+    passing every chunk to write() as it arrives. Returns the number of bytes read.
+    Returns as soon as the device is done instead of sleeping for a fixed time.
+    Raises CommandTimeout or OutputLimitExceeded.
+    """
+    received = 0
+    tail = b'' # Only the tail of the output can hold the prompt
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CommandTimeout(f"Prompt not seen within {timeout}s")
+        connection.settimeout(remaining)
+        try:
+            chunk = connection.recv(max_buffer)
+        except socket.timeout:
+            raise CommandTimeout(f"Prompt not seen within {timeout}s")
+        if not chunk:
+            raise CollectorError("Channel closed before the prompt was seen")
+        received += len(chunk)
+        if received > max_bytes:
+            raise OutputLimitExceeded(f"Output exceeded {max_bytes} bytes")
+        write(chunk)
+        tail = (tail + chunk)[-256:]
+        if prompt.search(tail):
+            return received
+
+
+def read_until_prompt(connection, prompt: re.Pattern, timeout: float = COMMAND_TIMEOUT,
+                      max_bytes: int = MAX_OUTPUT_BYTES) -> bytes:
+    """
+    Same as stream_until_prompt() but returns the whole output.
+    Errors carry the partial output received so far.
+    """
+    received_output = bytearray()
+    try:
+        stream_until_prompt(connection, prompt, received_output.extend, timeout=timeout, max_bytes=max_bytes)
+    except CollectorError as e:
+        e.output = bytes(received_output)
+        raise
+    return bytes(received_output)
+
+
+def learn_prompt(connection, timeout: float = NETWORK_TIMEOUT) -> re.Pattern:
+    """
+    Waits for the first prompt after login and returns a regex for it.
+    Any banner/MOTD received before the prompt is discarded.
+    """
+    received_output = read_until_prompt(connection, GENERIC_PROMPT, timeout=timeout)
+    last_line = received_output.splitlines()[-1].strip()
+    hostname = GENERIC_PROMPT.search(last_line).group(1).decode('utf-8', errors='ignore')
+    return compile_prompt(hostname)
+
+
+def send_command(connection, command: str, prompt: re.Pattern, timeout: float = COMMAND_TIMEOUT,
+                 max_bytes: int = MAX_OUTPUT_BYTES) -> str:
+    """Sends one command and returns its decoded output once the prompt is back."""
+    connection.send(command.strip() + "\n")
+    output = read_until_prompt(connection, prompt, timeout=timeout, max_bytes=max_bytes)
+    return output.decode('utf-8', errors='ignore')
+
+
+@dataclass
+class Session:
+    """
+    An SSH client, plus an interactive shell that is ready for commands.
+    The shell is only started when needed, exec-mode collection does not use it.
+    """
+    host: str
+    client: paramiko.SSHClient
+    shell: Optional[paramiko.Channel] = None
+    prompt: Optional[re.Pattern] = None
+    username: str = ""
+    port: int = 22
+    created: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+    def is_alive(self) -> bool:
+        transport = self.client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        return self.shell is None or not self.shell.closed
+
+    def start_shell(self):
+        """Invokes a shell, learns the prompt and disables pagination."""
+        if self.shell is not None:
+            return
+        self.shell = self.client.invoke_shell()
+        self.prompt = learn_prompt(self.shell)
+        send_command(self.shell, "terminal length 0", self.prompt)
+
+    def close(self):
+        if self.shell is not None:
+            self.shell.close()
+        self.client.close()
+
+
+def open_session(host: str, username: str, password: str, port: int = 22,
+                 keepalive: int = 0, shell: bool = True) -> Session:
+    """Connects and, unless shell is False, starts the interactive shell."""
+    ssh_client = paramiko.SSHClient()
+    try:
+        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        ssh_client.connect(
+            hostname=host,
+            port=port,
+            username=username,
+            password=password,
+            look_for_keys=False,
+            allow_agent=False,
+            timeout=NETWORK_TIMEOUT
+        )
+        if keepalive:
+            ssh_client.get_transport().set_keepalive(keepalive)
+        session = Session(host=host, client=ssh_client, username=username, port=port)
+        if shell:
+            session.start_shell()
+    except Exception:
+        ssh_client.close()
+        raise
+    return session
+
+
+def stream_until_eof(channel, write, timeout: float = COMMAND_TIMEOUT, max_bytes: int = MAX_OUTPUT_BYTES) -> int:
+    """
+    Reads an exec channel until the device closes it, passing every chunk to write().
+    Channel EOF marks the end of output, no prompt matching needed.
+    """
+    received = 0
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CommandTimeout(f"Channel not closed within {timeout}s")
+        channel.settimeout(remaining)
+        try:
+            chunk = channel.recv(max_buffer)
+        except socket.timeout:
+            raise CommandTimeout(f"Channel not closed within {timeout}s")
+        if not chunk:
+            return received
+        received += len(chunk)
+        if received > max_bytes:
+            raise OutputLimitExceeded(f"Output exceeded {max_bytes} bytes")
+        write(chunk)
+
+
+def run_exec_commands(session: Session, commands: list, result: DeviceResult, timeout: float = COMMAND_TIMEOUT,
+                      max_bytes: int = MAX_OUTPUT_BYTES, writer: Optional[StreamWriter] = None):
+    """
+    Opens one exec channel per command on the session's transport and starts them all
+    at once, so the whole command set costs about one round trip. Outputs are then read
+    in order. Raises ExecNotSupported if the device refuses an exec channel.
+    """
+    transport = session.client.get_transport()
+    channels = []
+    batch_start = time.perf_counter()
+    try:
+        for command in commands:
+            command = command.strip()
+            try:
+                channel = transport.open_session(timeout=NETWORK_TIMEOUT)
+                channel.set_combine_stderr(True)
+                channel.exec_command(command)
+            except paramiko.SSHException as e:
+                raise ExecNotSupported(f"Exec channel refused for '{command}': {e}")
+            channels.append((command, channel))
+
+        for command, channel in channels:
+            if writer is None:
+                received_output = bytearray()
+                size = stream_until_eof(channel, received_output.extend, timeout=timeout, max_bytes=max_bytes)
+                command_result = CommandResult(command, received_output.decode('utf-8', errors='ignore'), size=size)
+            else:
+                writer.write_text(f"--- Output for command: {command} ---\n")
+                size = stream_until_eof(channel, writer.write, timeout=timeout, max_bytes=max_bytes)
+                writer.write_text("\n\n")
+                command_result = CommandResult(command, size=size)
+            # All channels run concurrently, so time is measured from when the batch started
+            command_result.elapsed = time.perf_counter() - batch_start
+            result.results.append(command_result)
+    finally:
+        for _, channel in channels:
+            channel.close()
+    session.last_used = time.monotonic()
+
+
+def run_commands(session: Session, commands: list, result: DeviceResult, timeout: float = COMMAND_TIMEOUT,
+                 max_bytes: int = MAX_OUTPUT_BYTES, writer: Optional[StreamWriter] = None, mode: str = "shell",
+                 platform: Optional[str] = None):
+    """
+    Runs commands on an open session and appends a CommandResult for each one.
+    With a writer, output is streamed to it chunk by chunk instead of kept in memory.
+    In 'exec' mode commands run on exec channels, falling back to the shell for
+    SHELL_ONLY_PLATFORMS or devices that refuse the exec channel.
+    """
+    if mode not in COLLECTION_MODES:
+        raise ValueError(f"Unknown collection mode '{mode}', use one of {COLLECTION_MODES}")
+    if mode == "exec" and platform not in SHELL_ONLY_PLATFORMS:
+        try:
+            run_exec_commands(session, commands, result, timeout, max_bytes, writer)
+            return
+        except ExecNotSupported:
+            pass
+
+    session.start_shell()
+    for command in commands:
+        command = command.strip()
+        command_start = time.perf_counter()
+        if writer is None:
+            output = send_command(session.shell, command, session.prompt, timeout=timeout, max_bytes=max_bytes)
+            command_result = CommandResult(command, output, size=len(output))
+        else:
+            writer.write_text(f"--- Output for command: {command} ---\n")
+            session.shell.send(command + "\n")
+            size = stream_until_prompt(session.shell, session.prompt, writer.write, timeout=timeout,
+                                       max_bytes=max_bytes)
+            writer.write_text("\n\n")
+            command_result = CommandResult(command, size=size)
+        command_result.elapsed = time.perf_counter() - command_start
+        result.results.append(command_result)
+    session.last_used = time.monotonic()
+
+
+def collect_device(device_name: str, device_info: dict, commands: list, username: str, password: str,
+                   limiter: Optional[SessionLimiter] = None, timeout: float = COMMAND_TIMEOUT,
+                   max_bytes: int = MAX_OUTPUT_BYTES, pool=None, output_dir: Optional[str] = None,
+                   compression: Optional[str] = None, mode: str = "shell", cache=None,
+                   refresh: bool = False) -> DeviceResult:
+    """
+    Runs every command on one device and returns a DeviceResult. Never raises.
+    If a SessionPool is given, the session is borrowed from it instead of opened and closed here.
+    If output_dir is given, output is streamed to <output_dir>/<device>_output.txt (optionally
+    gzip/zstd compressed) and CommandResult.output is left empty.
+    mode='exec' uses one exec channel per command, see run_commands().
+    With a CommandCache, only commands missing from the cache are sent to the device
+    (refresh=True skips the lookup but still stores fresh output). Streamed output is not cached.
+    """
+    device_ip = device_info['ip']
+    site = device_info.get('site')
+    platform = device_info.get('platform')
+    result = DeviceResult(device=device_name, host=device_ip, site=site)
+    limiter = limiter or SessionLimiter()
+    use_cache = cache is not None and output_dir is None
+
+    cached_results = {}
+    if use_cache and not refresh:
+        for command in commands:
+            output = cache.get(device_name, command, platform)
+            if output is not None:
+                cached_results[command.strip()] = CommandResult(command.strip(), output, size=len(output), cached=True)
+    pending = [command for command in commands if command.strip() not in cached_results]
+    if not pending:
+        # Everything answered from the cache, the device is not touched at all
+        result.results = [cached_results[command.strip()] for command in commands]
+        return result
+
+    limiter.acquire(device_ip, site)
+    start = time.perf_counter()
+    writer = None
+    all_commands, commands = commands, pending
+    try:
+        if output_dir is not None:
+            writer = StreamWriter(os.path.join(output_dir, f"{device_name}_output.txt"), compression=compression)
+        if pool is not None:
+            with pool.session(device_ip, username, password) as session:
+                result.connect_time = time.perf_counter() - start
+                run_commands(session, commands, result, timeout, max_bytes, writer, mode, platform)
+        else:
+            # The shell is only started if exec mode is not used or falls back
+            session = open_session(device_ip, username, password, shell=(mode == "shell"))
+            try:
+                result.connect_time = time.perf_counter() - start
+                run_commands(session, commands, result, timeout, max_bytes, writer, mode, platform)
+            finally:
+                session.close()
+
+    # Keep the error class (AuthenticationException, timeout, ...) so callers can group failures
+    except Exception as e:
+        result.error = type(e).__name__
+        result.error_message = str(e)
+    finally:
+        if writer is not None:
+            writer.close()
+        limiter.release(device_ip, site)
+        result.elapsed = time.perf_counter() - start
+
+    if use_cache:
+        for command_result in result.results:
+            cache.set(device_name, command_result.command, command_result.output, platform)
+    if cached_results:
+        # Put cached and fresh results back in the order the commands were given
+        fresh_results = {command_result.command: command_result for command_result in result.results}
+        result.results = [
+            cached_results.get(command.strip()) or fresh_results[command.strip()]
+            for command in all_commands
+            if command.strip() in cached_results or command.strip() in fresh_results
+        ]
+    return result
+
+
+def collect_fleet(devices: dict, commands: list, username: str, password: str,
+                  max_workers: int = MAX_SESSIONS_TOTAL,
+                  per_host: int = MAX_SESSIONS_PER_HOST,
+                  per_site: int = MAX_SESSIONS_PER_SITE,
+                  timeout: float = COMMAND_TIMEOUT,
+                  max_bytes: int = MAX_OUTPUT_BYTES,
+                  pool=None,
+                  output_dir: Optional[str] = None,
+                  compression: Optional[str] = None,
+                  mode: str = "shell",
+                  cache=None,
+                  refresh: bool = False) -> list:
+    """
+    Collects commands from every device on a bounded thread pool.
+    Returns one DeviceResult per device, in the same order as the devices dict.
+    Pass a SessionPool to reuse SSH sessions across calls, and output_dir to stream
+    output to disk instead of holding it in the results. Pass a CommandCache to answer
+    repeated commands from disk, refresh=True bypasses cached entries.
+    """
+    limiter = SessionLimiter(per_host=per_host, per_site=per_site)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(collect_device, name, info, commands, username, password, limiter, timeout, max_bytes,
+                            pool, output_dir, compression, mode, cache, refresh)
+            for name, info in devices.items()
+        ]
+        return [future.result() for future in futures]
+
+
+def write_results(results: list):
+    """Writes each device's output to <device>_output.txt like paramiko_example2.py."""
+    for device_result in results:
+        if not device_result.ok:
+            continue
+        with open(f"{device_result.device}_output.txt", 'w', encoding='utf-8') as f:
+            for command_result in device_result.results:
+                f.write(f"--- Output for command: {command_result.command} ---\n")
+                f.write(command_result.output)
+                f.write("\n\n")
+
+
+def print_summary(results: list):
+    for device_result in results:
+        if device_result.ok:
+            cached = sum(1 for command_result in device_result.results if command_result.cached)
+            print(f"{device_result.device}: OK in {device_result.elapsed:.2f}s "
+                  f"(connect {device_result.connect_time:.2f}s, {len(device_result.results)} commands, "
+                  f"{cached} from cache)")
+        else:
+            print(f"{device_result.device}: {device_result.error} after {device_result.elapsed:.2f}s - "
+                  f"{device_result.error_message}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect commands from every device concurrently.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="ignore cached output and ask the devices again (fresh output is still cached)")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the command cache")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream output straight to <device>_output.txt, for very large outputs (not cached)")
+    args = parser.parse_args()
+
+    username = input('Username: ')
+    password = getpass.getpass('Password: ')
+
+    start = time.perf_counter()
+    if args.stream:
+        results = collect_fleet(devices, commands, username, password, output_dir=".")
+    else:
+        # Repeated troubleshooting runs answer from the cache instead of logging in again
+        cache = None if args.no_cache else CommandCache()
+        try:
+            results = collect_fleet(devices, commands, username, password, cache=cache, refresh=args.refresh)
+        finally:
+            if cache is not None:
+                cache.close()
+        write_results(results)
+    print_summary(results)
+    print(f"\nCollected {len(results)} devices in {time.perf_counter() - start:.2f}s.")
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 
-import paramiko, getpass, time
+import paramiko, getpass
+from paramiko_collector import learn_prompt, read_until_prompt
 
 devices = {'lax-edg-r1': {'ip': '192.168.2.51'},
            'lax-edg-r2': {'ip': '192.168.2.52'}}
@@ -9,12 +10,6 @@ commands = ['show version\n', 'show run\n']
 username = input('Username: ')
 password = getpass.getpass('Password: ')
 
-max_buffer = 65535
-
-def clear_buffer(connection):
-    if connection.recv_ready():
-        return connection.recv(max_buffer)
-
 # Starts the loop for devices
 for device in devices.keys():
     outputFileName = device + '_output.txt'
@@ -22,15 +17,14 @@ for device in devices.keys():
     connection.set_missing_host_key_policy(paramiko.AutoAddPolicy())
     connection.connect(devices[device]['ip'], username=username, password=password, look_for_keys=False, allow_agent=False)
     new_connection = connection.invoke_shell()
-    output = clear_buffer(new_connection)
-    time.sleep(5)
+    # Wait for the login prompt instead of sleeping, then reuse it to spot the end of each command
+    prompt = learn_prompt(new_connection)
     new_connection.send("terminal length 0\n")
-    output = clear_buffer(new_connection)
+    output = read_until_prompt(new_connection, prompt)
     with open(outputFileName, 'wb') as f:
         for command in commands:
             new_connection.send(command)
-            time.sleep(5)
-            output = new_connection.recv(max_buffer)
+            output = read_until_prompt(new_connection, prompt)
             print(output)
             f.write(output)
 
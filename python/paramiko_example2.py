@@ -1,35 +1,62 @@
 import paramiko
+import argparse
 import getpass
-import time
 import socket # Import socket for specific network errors
+from paramiko_collector import CollectorError, learn_prompt, send_command, stream_until_prompt
+from output_writer import StreamWriter
+from command_cache import CommandCache
 
 devices = {
-    'lax-edg-r1': {'ip': '192.168.2.51'},
-    'lax-edg-r2': {'ip': '192.168.2.52'}
+    'lax-edg-r1': {'ip': '192.168.2.51', 'platform': 'cisco_ios'},
+    'lax-edg-r2': {'ip': '192.168.2.52', 'platform': 'cisco_ios'}
 }
 commands = ['show version\n', 'show run\n']
 
+# --refresh asks the devices again but still caches the fresh output, --no-cache turns the cache off
+parser = argparse.ArgumentParser(description="Collect commands from each device in turn.")
+parser.add_argument("--refresh", action="store_true", help="ignore cached output and ask the devices again")
+parser.add_argument("--no-cache", action="store_true", help="neither read nor write the command cache")
+args = parser.parse_args()
+
 username = input('Username: ')
 password = getpass.getpass('Password: ')
 
-max_buffer = 65535 # Max bytes to read at once from the SSH buffer
 # A general timeout for network operations in seconds
 NETWORK_TIMEOUT = 10
-
-def clear_buffer(connection):
-    """
-    Reads and clears any data currently waiting in the receive buffer of an SSH connection.
-    Returns the read data if available, otherwise None.
-    """
-    if connection.recv_ready():
-        return connection.recv(max_buffer).decode('utf-8') # Decode bytes to string
-    return None # Explicitly return None if no data is ready
+# Max seconds to wait for the prompt to come back after a command (long 'show run' output)
+COMMAND_TIMEOUT = 60
+# Max bytes accepted from a single command before giving up
+MAX_OUTPUT_BYTES = 64 * 1024 * 1024
+# Set to "gzip" (or "zstd" if the zstandard package is installed) to compress the output file
+COMPRESSION = None
+# Outputs larger than this are streamed to the file but not kept in the cache
+MAX_CACHED_OUTPUT = 4 * 1024 * 1024
+
+# Repeated troubleshooting runs read recent output from the cache instead of logging in again
+cache = None if args.no_cache else CommandCache()
 
 # Starts the loop for devices
 for device_name, device_info in devices.items(): # Use .items() for easier access to name and info
     device_ip = device_info['ip']
+    platform = device_info.get('platform') # Part of the cache key, same as in paramiko_collector.py
     output_file_name = f"{device_name}_output.txt" # Use f-strings for cleaner formatting
 
+    # Look up every command first, the device is only contacted if something is missing
+    cached_outputs = {}
+    if cache is not None and not args.refresh:
+        for command in commands:
+            output = cache.get(device_name, command, platform)
+            if output is not None:
+                cached_outputs[command.strip()] = output
+    if len(cached_outputs) == len(commands):
+        print(f"\n--- All output for {device_name} taken from the cache ---")
+        with StreamWriter(output_file_name, compression=COMPRESSION, echo=True) as f:
+            for command in commands:
+                f.write_text(f"--- Output for command: {command.strip()} ---\n")
+                f.write_text(cached_outputs[command.strip()])
+                f.write_text("\n\n")
+        continue
+
     print(f"\n--- Attempting to connect to {device_name} ({device_ip}) ---")
 
     connection = None # Initialize connection to None for cleanup
@@ -56,62 +83,52 @@ for device_name, device_info in devices.items(): # Use .items() for easier acces
         new_connection = ssh_client.invoke_shell()
         print("Shell invoked.")
 
-        # (4) Clear initial buffer content
-        # Give the device a brief moment to send initial prompt/banner
-        time.sleep(1) # Reduced sleep here as clear_buffer is used
-        initial_output = clear_buffer(new_connection)
-        if initial_output:
-            print("Initial buffer cleared.")
-            # print(f"Initial output: \n{initial_output}") # Uncomment for debugging
+        # (4) Wait for the first prompt and learn it
+        # The banner is discarded and the prompt is used to detect the end of every command
+        prompt = learn_prompt(new_connection, timeout=NETWORK_TIMEOUT)
+        print(f"Prompt learned: {prompt.pattern!r}")
 
         # (5) Send 'terminal length 0' command to disable pagination
-        new_connection.send("terminal length 0\n")
-        # Give time for the command to be processed and its output sent
-        time.sleep(1)
-        # Clear the buffer after sending 'terminal length 0'
-        terminal_len_output = clear_buffer(new_connection)
-        if terminal_len_output:
-            print("'terminal length 0' command sent and its output cleared.")
-            # print(f"Terminal length output: \n{terminal_len_output}") # Uncomment for debugging
-
-        # (6) Open a file to write the output to
-        # Use 'w' for text mode, and specify encoding if you expect non-ASCII characters.
-        # This will auto-decode the output from the device.
-        with open(output_file_name, 'w', encoding='utf-8') as f:
+        send_command(new_connection, "terminal length 0", prompt, timeout=NETWORK_TIMEOUT)
+        print("'terminal length 0' command sent and its output cleared.")
+
+        # (6) Open a streaming writer for the output file
+        # Each chunk is decoded incrementally, printed and written as soon as it arrives,
+        # so even a 50 MB 'show tech' never sits in memory as one big buffer.
+        with StreamWriter(output_file_name, compression=COMPRESSION, echo=True) as f:
             # (7) Loop through each command
             for command in commands:
                 print(f"Sending command: {command.strip()}") # .strip() to remove \n for print
+                print("--- Command Output Start ---")
+                f.write_text(f"--- Output for command: {command.strip()} ---\n")
+
+                if command.strip() in cached_outputs:
+                    f.write_text(cached_outputs[command.strip()])
+                    f.write_text("\n\n")
+                    print("--- Command Output End (cached) ---")
+                    continue
+
+                # (8) Send the command and stream the output until the prompt comes back
+                # Returns as soon as the device is done, no fixed sleep needed
+                # (9) The output is decoded to a string before printing/writing to the file
+                # Chunks also go to a buffer for the cache, up to MAX_CACHED_OUTPUT
+                cache_buffer = bytearray()
+                def write(chunk):
+                    f.write(chunk)
+                    if len(cache_buffer) <= MAX_CACHED_OUTPUT:
+                        cache_buffer.extend(chunk)
                 new_connection.send(command)
+                received = stream_until_prompt(new_connection, prompt, write,
+                                               timeout=COMMAND_TIMEOUT, max_bytes=MAX_OUTPUT_BYTES)
+                if cache is not None and received <= MAX_CACHED_OUTPUT:
+                    cache.set(device_name, command, cache_buffer.decode('utf-8', errors='ignore'), platform)
 
-                # (8) Wait for a short period for command execution and output
-                # Adjust this sleep based on average command execution time on your devices
-                time.sleep(3) # A more typical sleep, adjust as needed
-
-                # (9) Read the output of the command
-                # Use a loop to ensure all output is captured, as recv might not get everything at once
-                received_output = b'' # Initialize as bytes
-                start_time = time.time()
-                while new_connection.recv_ready() and (time.time() - start_time < NETWORK_TIMEOUT):
-                    received_output += new_connection.recv(max_buffer)
-                    # Small sleep to allow more data to arrive if it's large
-                    time.sleep(0.1)
-
-                if not received_output:
-                    print(f"Warning: No output received for command '{command.strip()}'")
-                    # Optionally, you might want to try reading again after a short delay
-                    # received_output = new_connection.recv(max_buffer) # One last try
-
-                # (10) Decode the bytes to a string before printing/writing to a text file
-                decoded_output = received_output.decode('utf-8', errors='ignore') # 'ignore' to handle problematic characters
-
-                print("--- Command Output Start ---")
-                print(decoded_output)
+                f.write_text("\n\n") # Add extra newlines for readability in the file
                 print("--- Command Output End ---")
-                f.write(f"--- Output for command: {command.strip()} ---\n")
-                f.write(decoded_output)
-                f.write("\n\n") # Add extra newlines for readability in the file
 
     # --- Error Handling Blocks ---
+    except CollectorError as e:
+        print(f"ERROR: Reading output from {device_name} failed: {e}")
     except paramiko.AuthenticationException:
         print(f"ERROR: Authentication failed for {device_name}. Check username/password.")
     except paramiko.SSHException as e:
@@ -123,7 +140,7 @@ for device_name, device_info in devices.items(): # Use .items() for easier acces
     except Exception as e: # Catch any other unexpected errors
         print(f"AN UNEXPECTED ERROR OCCURRED for {device_name}: {e}")
     finally:
-        # (11) Ensure connections are closed whether an error occurred or not
+        # (10) Ensure connections are closed whether an error occurred or not
         if 'new_connection' in locals() and new_connection:
             new_connection.close()
             print("Shell closed.")
@@ -132,4 +149,7 @@ for device_name, device_info in devices.items(): # Use .items() for easier acces
             print("SSH client closed.")
         print(f"--- Finished processing {device_name} ---")
 
+if cache is not None:
+    cache.close()
+
 print("\nScript completed.")
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""
+Chunked process-pool map shared by the batch renderer and the compliance engines.
+
+Items are sent to the workers in chunks, about four per worker, so the
+pickling overhead per item stays low and per-worker caches (templates,
+variables, parsed configs) are reused within a chunk.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+MAX_WORKERS = os.cpu_count()
+CHUNKS_PER_WORKER = 4
+
+
+def map_chunks(func, items: list, *args, max_workers: int = MAX_WORKERS):
+    """
+    Calls func(chunk, *args) for consecutive chunks of items on a process pool and
+    yields each call's result (a list, one entry per item) in item order.
+    """
+    if not items:
+        return
+    workers = max(1, min(max_workers or 1, len(items)))
+    chunk_size = max(1, len(items) // (workers * CHUNKS_PER_WORKER))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(func, chunks, *([arg] * len(chunks) for arg in args))
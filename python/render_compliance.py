@@ -0,0 +1,104 @@
+"""
+Render + compliance in a single pass.
+
+For every device in the inventory the intended config is rendered in memory
+(same templates and variables as batch_renderer.py), parsed straight into
+hier_config and diffed against the collected running config. Devices are
+spread over a process pool and everything ends up in one JSON report, with no
+intermediate intended-config files.
+"""
+import io
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from hier_config import WorkflowRemediation, get_hconfig
+from hier_config.utils import hconfig_v2_os_v3_platform_mapper
+
+from batch_renderer import CONTEXT_LAYERS_DIR, MAX_WORKERS, load_inventory, render_to
+from process_pool import map_chunks
+
+RUNNING_DIR = "running" # Collected running configs, one <device>.txt per device
+REPORT_FILE = "compliance-report.json"
+
+# Inventory platform (Nautobot network driver) -> hier_config OS name
+HIERCONFIG_OS = {
+    "cisco_ios": "ios",
+    "cisco_xe": "ios",
+    "cisco_xr": "iosxr",
+    "cisco_nxos": "nxos",
+    "arista_eos": "eos",
+}
+
+
+def check_device(device_name: str, device: dict, running_dir: str = RUNNING_DIR,
+                 layers_dir: Optional[str] = CONTEXT_LAYERS_DIR) -> dict:
+    """Renders the device's intended config and returns its remediation against the running config. Never raises."""
+    result = {"device": device_name, "compliant": None, "remediation": None, "elapsed": 0.0, "error": None}
+    start = time.perf_counter()
+    try:
+        intended_buffer = io.StringIO()
+        render_to(intended_buffer, device_name, device, layers_dir)
+        with open(os.path.join(running_dir, f"{device_name}.txt"), "r") as f:
+            actual = f.read()
+
+        try:
+            hierconfig_os = hconfig_v2_os_v3_platform_mapper(HIERCONFIG_OS[device["platform"]])
+            hierconfig_running_config = get_hconfig(hierconfig_os, actual)
+            hierconfig_intended_config = get_hconfig(hierconfig_os, intended_buffer.getvalue())
+            hierconfig_wfr = WorkflowRemediation(
+                hierconfig_running_config,
+                hierconfig_intended_config,
+            )
+        except Exception as err:  # pylint: disable=broad-except:
+            raise Exception(  # pylint: disable=broad-exception-raised
+                f"Cannot instantiate HierConfig on {device_name}, check Device, Platform and Hier Options. "
+                f"Original error: {err}"
+            ) from err
+
+        remediation_config = hierconfig_wfr.remediation_config_filtered_text(include_tags={}, exclude_tags={})
+        result["remediation"] = remediation_config
+        result["compliant"] = not remediation_config.strip()
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def _check_chunk(chunk: list, running_dir: str, layers_dir: Optional[str]) -> list:
+    return [check_device(device_name, device, running_dir, layers_dir) for device_name, device in chunk]
+
+
+def check_fleet(inventory: dict, running_dir: str = RUNNING_DIR, max_workers: int = MAX_WORKERS,
+                layers_dir: Optional[str] = CONTEXT_LAYERS_DIR) -> list:
+    """Runs check_device for every inventory device on a process pool, in inventory order."""
+    results = []
+    for chunk_results in map_chunks(_check_chunk, list(inventory.items()), running_dir, layers_dir,
+                                    max_workers=max_workers):
+        results.extend(chunk_results)
+    return results
+
+
+def write_report(results: list, report_file: str = REPORT_FILE) -> dict:
+    """Writes one JSON report with a fleet summary and the remediation of every device."""
+    report = {
+        "generated": datetime.now(timezone.utc).isoformat(),
+        "summary": {
+            "devices": len(results),
+            "compliant": sum(1 for result in results if result["compliant"] is True),
+            "non_compliant": sum(1 for result in results if result["compliant"] is False),
+            "errors": sum(1 for result in results if result["error"]),
+        },
+        "devices": {result["device"]: result for result in results},
+    }
+    with open(report_file, "w") as fout:
+        json.dump(report, fout, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    report = write_report(check_fleet(load_inventory()))
+    print(f"{report['summary']} in {time.perf_counter() - start:.2f}s, report written to {REPORT_FILE}")
@@ -0,0 +1,94 @@
+"""
+Variables layer for the renderers.
+
+Config context YAML files are parsed with the C-accelerated loader when
+PyYAML was built with libyaml, and the parsed result is cached on disk as a
+pickle keyed by the SHA-256 of the file, so an unchanged file is only parsed
+once. Several context files (e.g. aaa + ntp + logging) can be merged into one
+context, and each combination is merged once per process.
+"""
+import hashlib
+import os
+import pickle
+from functools import lru_cache
+
+import yaml
+
+try:
+    from yaml import CLoader as Loader
+except ImportError: # PyYAML built without libyaml
+    from yaml import Loader
+
+CACHE_DIR = os.environ.get("YAML_CONTEXT_CACHE", os.path.expanduser("~/.cache/network_automation/yaml"))
+
+
+# (path, mtime, size) -> digest, so files are only re-hashed when they change on disk
+_hashes = {}
+
+
+def file_hash(path: str) -> str:
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _hashes:
+        with open(path, "rb") as fin:
+            _hashes[key] = hashlib.sha256(fin.read()).hexdigest()
+    return _hashes[key]
+
+
+@lru_cache(maxsize=None)
+def _load_by_hash(path: str, digest: str, cache_dir: str):
+    cache_file = os.path.join(cache_dir, f"{digest}.pickle") if cache_dir else None
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with open(cache_file, "rb") as fin:
+                return pickle.load(fin)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass # Corrupt or partial entry, parse the YAML again
+
+    with open(path, "r") as fin:
+        data = yaml.load(fin.read(), Loader=Loader)
+
+    if cache_file:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temp file and rename so parallel workers never read a partial entry
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as fout:
+            pickle.dump(data, fout, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    return data
+
+
+def load_variables(path: str, cache_dir: str = CACHE_DIR):
+    """
+    Returns the parsed content of a YAML file, from the on-disk cache when the file is unchanged.
+    The result is shared between callers, do not modify it.
+    """
+    return _load_by_hash(path, file_hash(path), cache_dir)
+
+
+def deep_merge(base: dict, overlay: dict) -> dict:
+    """Returns base updated with overlay, merging nested dicts; overlay wins on conflicts."""
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+@lru_cache(maxsize=None)
+def _merge_files(paths: tuple, digests: tuple, cache_dir: str) -> dict:
+    merged = {}
+    for path, digest in zip(paths, digests):
+        merged = deep_merge(merged, _load_by_hash(path, digest, cache_dir) or {})
+    return merged
+
+
+def load_context(paths, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Deep-merges several context files in order into one config context.
+    Devices sharing the same file list reuse the same merged result.
+    """
+    paths = tuple(paths)
+    return _merge_files(paths, tuple(file_hash(path) for path in paths), cache_dir)
@@ -1,6 +1,7 @@
-from jinja2 import Environment, FileSystemLoader, StrictUndefined
-import yaml
-from yaml import Loader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined
+import os
+import sys
+from render_variables import load_variables
 
 # TEMPLATEDIR = "video-config-templates/cisco_nxos"
 TEMPLATEDIR = "video-config-templates/cisco_xr"
@@ -27,19 +28,48 @@ VARIABLES_FILE = "video-config-variables/config_contexts/video_iosxr_logging.yml
 # VARIABLES_FILE = "video-config-variables/config_contexts/video_nxos_mgmt.yml"
 
 OUTPUT_FILE = "output-mytest.txt"
+# OUTPUT_FILE = "-" # Write to stdout, e.g. to pipe into a deploy step
 
-with open(VARIABLES_FILE, "r") as fin:
-    _variables = yaml.load(fin.read(), Loader=Loader)
+# Write the output in chunks as the template renders instead of building one big string.
+# Keeps memory bounded for huge generated ACLs and prefix-lists. The chunks go to
+# OUTPUT_FILE.tmp, which only replaces OUTPUT_FILE once the whole template rendered.
+STREAM_OUTPUT = True
+
+# Compiled templates are cached here so later runs skip the template compile step
+BYTECODE_CACHE_DIR = os.environ.get("JINJA_BYTECODE_CACHE", os.path.expanduser("~/.cache/network_automation/jinja"))
+os.makedirs(BYTECODE_CACHE_DIR, exist_ok=True)
+
+# Uses the C YAML loader when available and a parsed copy cached by file hash
+_variables = load_variables(VARIABLES_FILE)
 VARIABLES = {"config_context": _variables, "hostname": "CHANGE_ME", "device": {}}
 # print(VARIABLES)
 
 env = Environment(
     loader=FileSystemLoader(TEMPLATEDIR), trim_blocks=True, lstrip_blocks=True, undefined=StrictUndefined,#, keep_trailing_newline=True
+    bytecode_cache=FileSystemBytecodeCache(BYTECODE_CACHE_DIR),
 )
 template = env.get_template(TEMPLATE)
 
-data = template.render(**VARIABLES)
+if STREAM_OUTPUT:
+    stream = template.stream(**VARIABLES)
+    stream.enable_buffering(size=64) # Write every 64 template chunks rather than every tiny one
+    if OUTPUT_FILE == "-":
+        stream.dump(sys.stdout)
+    else:
+        try:
+            with open(f"{OUTPUT_FILE}.tmp", "w") as fout:
+                stream.dump(fout)
+            os.replace(f"{OUTPUT_FILE}.tmp", OUTPUT_FILE)
+        except Exception:
+            # A render error halfway through must not leave a truncated output file behind
+            os.remove(f"{OUTPUT_FILE}.tmp")
+            raise
+else:
+    data = template.render(**VARIABLES)
 
-# print(data)
-with open(OUTPUT_FILE, "w") as fout:
-    fout.write(data)
\ No newline at end of file
+    # print(data)
+    if OUTPUT_FILE == "-":
+        sys.stdout.write(data)
+    else:
+        with open(OUTPUT_FILE, "w") as fout:
+            fout.write(data)
\ No newline at end of file
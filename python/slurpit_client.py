@@ -0,0 +1,124 @@
+"""
+Paginated Slurpit inventory client.
+
+slurpit_api_sample.py pulls /api/devices in one response, which gets huge and
+slow with tens of thousands of devices. SlurpitClient pages through the
+inventory with offset/limit, keeps several page requests in flight over one
+pooled keep-alive requests.Session and yields devices as pages arrive, so a
+downstream sync can start before the whole inventory is downloaded.
+"""
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from rich import print
+from urllib3.util.retry import Retry
+
+base_url = "http://slurpit-docker.clab.net:81/api"
+api_key = os.environ.get("SLURPIT_API_KEY", "")
+
+PAGE_SIZE = 500
+MAX_WORKERS = 4 # Pages in flight, also the size of the connection pool
+TIMEOUT = (5, 60) # Connect and read timeouts in seconds
+RETRIES = 3 # For connection errors, 429 and 5xx responses
+
+
+class SlurpitClient:
+    """Pooled, keep-alive Slurpit API client. Use as a context manager or call close()."""
+
+    def __init__(self, base_url: str = base_url, api_key: str = api_key, max_workers: int = MAX_WORKERS,
+                 timeout: tuple = TIMEOUT, retries: int = RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "accept": "application/json",
+            "Authorization": f"Bearer {api_key}"
+        })
+        retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, path: str, **params):
+        response = self.session.get(f"{self.base_url}/{path.lstrip('/')}", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def get_page(self, path: str, offset: int, limit: int) -> list:
+        return self.get(path, offset=offset, limit=limit)
+
+    def iter_pages(self, path: str = "devices", page_size: int = PAGE_SIZE):
+        """
+        Yields pages (lists) in order. The total is not known up front, so max_workers
+        consecutive pages are kept in flight until a short page marks the end.
+        A server that ignores limit sends everything in the first page, which is yielded
+        once. One that honours limit but ignores offset raises ValueError instead of
+        repeating the first page forever.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = deque()
+            next_offset = 0
+            first_page = None
+            done = False
+            while True:
+                while not done and len(in_flight) < self.max_workers:
+                    in_flight.append(executor.submit(self.get_page, path, next_offset, page_size))
+                    next_offset += page_size
+                if not in_flight:
+                    return
+                page = in_flight.popleft().result()
+                if first_page is None:
+                    first_page = page
+                elif page and page == first_page:
+                    raise ValueError(f"{path} ignores offset, got the first page again")
+                if len(page) > page_size:
+                    # Not paginated, this is the whole inventory
+                    done = True
+                    for future in in_flight:
+                        future.cancel()
+                    in_flight.clear()
+                elif len(page) < page_size:
+                    # Last page, requests already sent past the end come back empty
+                    done = True
+                    for future in in_flight:
+                        future.cancel()
+                    in_flight.clear()
+                if page:
+                    yield page
+
+    def iter_devices(self, page_size: int = PAGE_SIZE):
+        """Yields devices one by one as their pages arrive."""
+        for page in self.iter_pages("devices", page_size):
+            yield from page
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    count = 0
+    with SlurpitClient() as client:
+        try:
+            for device in client.iter_devices():
+                if count < 5:
+                    print(device)
+                count += 1
+        except requests.RequestException as e:
+            # HTTPError carries the response, RetryError/ConnectionError do not
+            if e.response is not None:
+                print(f"Error: {e.response.status_code}")
+                print(e.response.text)
+            else:
+                print(f"Error: {e}")
+    print(f"{count} devices")
@@ -0,0 +1,135 @@
+"""
+Persistent SSH session pool for the paramiko collectors.
+
+Sessions are keyed by (host, port, username) and kept open between command
+batches, so scheduled polling does not redo the key exchange, shell setup and
+'terminal length 0' on every run. Idle sessions are health-checked before
+reuse and evicted once they have been idle for too long.
+"""
+import getpass
+import threading
+import time
+from contextlib import contextmanager
+
+from paramiko_collector import Session, collect_fleet, devices, commands, open_session, print_summary, send_command
+
+IDLE_TIMEOUT = 300 # Close sessions that have not been used for this many seconds
+KEEPALIVE_INTERVAL = 30 # SSH keepalive packets so devices don't drop idle sessions
+HEALTH_CHECK_AFTER = 60 # Send a probe before reusing a session idle for longer than this
+
+
+class SessionPool:
+    """Thread-safe pool of ready-to-use SSH sessions."""
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT, keepalive: int = KEEPALIVE_INTERVAL,
+                 health_check_after: float = HEALTH_CHECK_AFTER):
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.health_check_after = health_check_after
+        self._lock = threading.Lock()
+        self._idle = {} # key -> list of idle Sessions
+        self.stats = {"created": 0, "reused": 0, "evicted": 0}
+
+    @staticmethod
+    def _key(host: str, username: str, port: int = 22) -> tuple:
+        return (host, port, username)
+
+    def _is_healthy(self, session: Session) -> bool:
+        """Cheap transport check, plus a prompt probe if the session sat idle for a while."""
+        if not session.is_alive():
+            return False
+        if session.shell is None or time.monotonic() - session.last_used < self.health_check_after:
+            return True
+        try:
+            send_command(session.shell, "", session.prompt, timeout=5)
+        except Exception:
+            return False
+        return True
+
+    def acquire(self, host: str, username: str, password: str, port: int = 22) -> Session:
+        """Returns an idle healthy session for the key, or opens a new one."""
+        key = self._key(host, username, port)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                session = idle.pop() if idle else None
+            if session is None:
+                break
+            if self._is_healthy(session):
+                self.stats["reused"] += 1
+                return session
+            session.close()
+            self.stats["evicted"] += 1
+
+        # The shell is started on first use, exec-mode callers never need it
+        session = open_session(host, username, password, port=port, keepalive=self.keepalive, shell=False)
+        self.stats["created"] += 1
+        return session
+
+    def release(self, session: Session):
+        """Hands a session back to the pool for reuse."""
+        session.last_used = time.monotonic()
+        key = self._key(session.host, session.username, session.port)
+        with self._lock:
+            self._idle.setdefault(key, []).append(session)
+
+    @contextmanager
+    def session(self, host: str, username: str, password: str, port: int = 22):
+        """
+        Borrows a session for the duration of the with-block.
+        A session that raised is closed instead of returned, since its shell may be mid-output.
+        """
+        session = self.acquire(host, username, password, port)
+        try:
+            yield session
+        except Exception:
+            session.close()
+            raise
+        else:
+            self.release(session)
+
+    def evict_idle(self) -> int:
+        """Closes sessions idle for longer than idle_timeout. Returns how many were closed."""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for key, idle in self._idle.items():
+                keep = []
+                for session in idle:
+                    (expired if now - session.last_used > self.idle_timeout else keep).append(session)
+                self._idle[key] = keep
+        for session in expired:
+            session.close()
+        self.stats["evicted"] += len(expired)
+        return len(expired)
+
+    def close(self):
+        """Closes every idle session in the pool."""
+        with self._lock:
+            sessions = [session for idle in self._idle.values() for session in idle]
+            self._idle.clear()
+        for session in sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    # Polls the same devices every few minutes over the same SSH sessions
+    POLL_INTERVAL = 180
+
+    username = input('Username: ')
+    password = getpass.getpass('Password: ')
+
+    with SessionPool() as pool:
+        while True:
+            start = time.perf_counter()
+            results = collect_fleet(devices, commands, username, password, pool=pool)
+            print_summary(results)
+            print(f"Cycle took {time.perf_counter() - start:.2f}s, pool stats: {pool.stats}\n")
+            pool.evict_idle()
+            time.sleep(POLL_INTERVAL)